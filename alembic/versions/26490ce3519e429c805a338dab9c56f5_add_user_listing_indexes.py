@@ -0,0 +1,73 @@
+"""add user listing indexes
+
+Revision ID: 26490ce3519e429c805a338dab9c56f5
+Revises: a912436e53994c8d837a87afb13b5249
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '26490ce3519e429c805a338dab9c56f5'
+down_revision = 'a912436e53994c8d837a87afb13b5249'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = {
+    "ix_users_created": [sa.text("created_at DESC"), sa.text("id DESC")],
+    "ix_users_type_active_created": [
+        sa.text("user_type"),
+        sa.text("is_active"),
+        sa.text("created_at DESC"),
+        sa.text("id DESC"),
+    ],
+    "ix_users_fullname": ["fullname", "id"],
+    "ix_users_domisili_lower": [sa.text("lower(domisili)")],
+}
+
+
+def _invalid_indexes(bind) -> set:
+    # A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind
+    return set(bind.execute(sa.text("""
+        SELECT c.relname FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_class t ON t.oid = i.indrelid
+        WHERE t.relname = 'users' AND NOT i.indisvalid
+    """)).scalars().all())
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("users"):
+        return
+
+    existing = {index["name"] for index in inspector.get_indexes("users")}
+    postgres = bind.dialect.name == "postgresql"
+    invalid = _invalid_indexes(bind) if postgres else set()
+
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            if name in invalid:
+                op.drop_index(name, table_name="users", postgresql_concurrently=True)
+                existing.discard(name)
+            if name not in existing:
+                op.create_index(name, "users", columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("users"):
+        return
+
+    existing = {index["name"] for index in inspector.get_indexes("users")}
+    with op.get_context().autocommit_block():
+        for name in reversed(list(INDEXES)):
+            if name in existing:
+                op.drop_index(name, table_name="users", postgresql_concurrently=True)
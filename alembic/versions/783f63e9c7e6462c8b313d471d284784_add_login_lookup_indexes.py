@@ -0,0 +1,82 @@
+"""add login lookup indexes
+
+Revision ID: 783f63e9c7e6462c8b313d471d284784
+Revises: 71db361743554b72ab52b2429b6e56a8
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '783f63e9c7e6462c8b313d471d284784'
+down_revision = '71db361743554b72ab52b2429b6e56a8'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = {
+    "ix_users_email_lower": ([sa.text("lower(email)")], True),
+    "ix_users_username_lower": ([sa.text("lower(username)")], True),
+    # Must match app.db.models.user.normalized_phone exactly for the planner to use it
+    "ix_users_phone_normalized": ([sa.text("regexp_replace(phone_number, '[^0-9]', '', 'g')")], False),
+}
+
+
+def _invalid_indexes(bind) -> set:
+    # A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind
+    return set(bind.execute(sa.text("""
+        SELECT c.relname FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_class t ON t.oid = i.indrelid
+        WHERE t.relname = 'users' AND NOT i.indisvalid
+    """)).scalars().all())
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("users"):
+        return
+
+    existing = {index["name"] for index in inspector.get_indexes("users")}
+    postgres = bind.dialect.name == "postgresql"
+    invalid = _invalid_indexes(bind) if postgres else set()
+
+    for column in ("email", "username"):
+        duplicates = bind.execute(
+            sa.text(
+                f"SELECT lower({column}) FROM users GROUP BY lower({column}) HAVING COUNT(*) > 1"
+            )
+        ).scalars().all()
+        if duplicates:
+            raise RuntimeError(
+                f"Cannot add case-insensitive unique index on users.{column}; "
+                f"resolve these duplicates first: {', '.join(duplicates[:20])}"
+            )
+
+    # CONCURRENTLY keeps users writable (registrations, logins with rehash)
+    # during the build but cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, (columns, unique) in INDEXES.items():
+            if name in invalid:
+                op.drop_index(name, table_name="users", postgresql_concurrently=True)
+                existing.discard(name)
+            if name not in existing:
+                op.create_index(name, "users", columns, unique=unique, postgresql_concurrently=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("users"):
+        return
+
+    existing = {index["name"] for index in inspector.get_indexes("users")}
+    with op.get_context().autocommit_block():
+        for name in reversed(list(INDEXES)):
+            if name in existing:
+                op.drop_index(name, table_name="users", postgresql_concurrently=True)
@@ -0,0 +1,72 @@
+"""create contribution_summaries
+
+Revision ID: 96312b1762eb4507b1a5932459e3a4fb
+Revises: 26490ce3519e429c805a338dab9c56f5
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '96312b1762eb4507b1a5932459e3a4fb'
+down_revision = '26490ce3519e429c805a338dab9c56f5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if inspector.has_table("contribution_summaries"):
+        return
+
+    # Reuse the enum type created for transactions.status
+    if bind.dialect.name == "postgresql":
+        status_type = postgresql.ENUM(name="transactionstatus", create_type=False)
+    else:
+        status_type = sa.Enum("sent", "on_process", "completed", name="transactionstatus")
+
+    op.create_table(
+        "contribution_summaries",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("periode_id", sa.Integer(), sa.ForeignKey("periodes.id", ondelete="CASCADE"), nullable=True),
+        sa.Column("status", status_type, nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_amount", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index(
+        "ux_contribution_summaries_key",
+        "contribution_summaries",
+        ["user_id", sa.text("coalesce(periode_id, 0)"), "status"],
+        unique=True,
+    )
+    op.create_index("ix_contribution_summaries_periode", "contribution_summaries", ["periode_id"])
+
+    # Backfill from the existing history
+    if inspector.has_table("transactions"):
+        op.execute(
+            """
+            INSERT INTO contribution_summaries (user_id, periode_id, status, count, total_amount)
+            SELECT user_id, periode_id, status, count(*), coalesce(sum(amount), 0)
+            FROM transactions
+            GROUP BY user_id, periode_id, status
+            """
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("contribution_summaries"):
+        return
+
+    op.drop_index("ix_contribution_summaries_periode", table_name="contribution_summaries")
+    op.drop_index("ux_contribution_summaries_key", table_name="contribution_summaries")
+    op.drop_table("contribution_summaries")
@@ -0,0 +1,74 @@
+"""add transaction listing indexes
+
+Revision ID: a912436e53994c8d837a87afb13b5249
+Revises: 783f63e9c7e6462c8b313d471d284784
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a912436e53994c8d837a87afb13b5249'
+down_revision = '783f63e9c7e6462c8b313d471d284784'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = {
+    "ix_transactions_reported_by_created": [
+        sa.text("reported_by_id"),
+        sa.text("created_at DESC"),
+        sa.text("id DESC"),
+    ],
+    "ix_transactions_created": [sa.text("created_at DESC"), sa.text("id DESC")],
+    "ix_transactions_periode_status": ["periode_id", "status"],
+    "ix_transactions_payment_id": ["payment_id"],
+}
+
+
+def _invalid_indexes(bind) -> set:
+    # A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind
+    return set(bind.execute(sa.text("""
+        SELECT c.relname FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_class t ON t.oid = i.indrelid
+        WHERE t.relname = 'transactions' AND NOT i.indisvalid
+    """)).scalars().all())
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("transactions"):
+        return
+
+    existing = {index["name"] for index in inspector.get_indexes("transactions")}
+    postgres = bind.dialect.name == "postgresql"
+    invalid = _invalid_indexes(bind) if postgres else set()
+
+    # CONCURRENTLY keeps the table writable during the build but cannot run
+    # inside a transaction
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            if name in invalid:
+                op.drop_index(name, table_name="transactions", postgresql_concurrently=True)
+                existing.discard(name)
+            if name not in existing:
+                op.create_index(name, "transactions", columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("transactions"):
+        return
+
+    existing = {index["name"] for index in inspector.get_indexes("transactions")}
+    with op.get_context().autocommit_block():
+        for name in reversed(list(INDEXES)):
+            if name in existing:
+                op.drop_index(name, table_name="transactions", postgresql_concurrently=True)
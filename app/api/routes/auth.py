@@ -1,13 +1,17 @@
 # app/api/routes/auth.py
-from datetime import timedelta
+import math
+import re
+from datetime import timedelta, timezone
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, File, UploadFile, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy import func, inspect as sa_inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from app.db.session import get_db
-from app.db.models.user import User
+from app.db.models.user import User, UserType, normalized_phone
 from app.schemas.user import (
     UserLogin,
     UserForgotPassword,
@@ -15,15 +19,23 @@ from app.schemas.user import (
     UserResponse,
     BaseResponse,
 )
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.rate_limit import TokenBucketLimiter, get_backend as get_rate_limit_backend
+from app.core.revocation import RevocationStore
 from app.core.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
     create_access_token,
+    access_token_claims,
     create_refresh_token,   # ✅ new
-    SECRET_KEY,
-    REFRESH_SECRET_KEY,     # ✅ new (add this to your security.py)
-    ALGORITHM,
+    decode_access_token,
+    refresh_token_id,
+    decode_refresh_token,
 )
+from app.core.tokens import TokenError, TokenExpiredError
+from app.utils.conditional import make_etag, not_modified, validator_headers
 from datetime import datetime
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -34,20 +46,86 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 security = HTTPBearer()
 
 # ----------------------------------------------------------
-# In-memory blacklist for refresh tokens (temporary)
+# Revoked refresh tokens (shared via Postgres, filtered per worker)
 # ----------------------------------------------------------
-BLACKLISTED_REFRESH_TOKENS: set[str] = set()
+revocation_store = RevocationStore(
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    error_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+    sync_interval=settings.REVOCATION_SYNC_SECONDS,
+    purge_interval=settings.REVOCATION_PURGE_SECONDS,
+)
 
 # ----------------------------------------------------------
-# Helper: Get current user from Access Token
+# Login throttle: per client IP and per identifier
 # ----------------------------------------------------------
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    token = credentials.credentials
+login_rate_backend = get_rate_limit_backend(settings.LOGIN_RATE_BACKEND)
+login_ip_limiter = TokenBucketLimiter(
+    capacity=settings.LOGIN_RATE_IP_BURST,
+    refill_per_second=settings.LOGIN_RATE_IP_PER_MINUTE / 60,
+    backend=login_rate_backend,
+)
+login_identifier_limiter = TokenBucketLimiter(
+    capacity=settings.LOGIN_RATE_IDENTIFIER_BURST,
+    refill_per_second=settings.LOGIN_RATE_IDENTIFIER_PER_MINUTE / 60,
+    backend=login_rate_backend,
+)
+
+
+def throttle_login(client_ip: str, identifier: str) -> None:
+    # Runs before the user lookup and argon2 verify, so rejections cost almost nothing
+    allowed, retry_after = login_ip_limiter.hit(f"login:ip:{client_ip}")
+    if allowed:
+        allowed, retry_after = login_identifier_limiter.hit(f"login:id:{login_identifier_key(identifier)}")
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def login_throttle_stats() -> dict:
+    ip_stats = login_ip_limiter.stats()
+    identifier_stats = login_identifier_limiter.stats()
+    return {
+        "per_ip": ip_stats,
+        "per_identifier": identifier_stats,
+        "verifications_shed": ip_stats["rejected"] + identifier_stats["rejected"],
+    }
+
+
+# ----------------------------------------------------------
+# Principal cache: token subject (email) -> User column snapshot
+# ----------------------------------------------------------
+principal_cache = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def _snapshot_user(user: User) -> dict:
+    return {attr.key: getattr(user, attr.key) for attr in sa_inspect(User).column_attrs}
+
+
+async def _user_from_snapshot(db: AsyncSession, snapshot: dict) -> User:
+    # Rebuild a persistent User without a SELECT so routes can still mutate and commit it
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+def invalidate_principal(*emails: Optional[str]) -> None:
+    """Drop cached principals; call after committing any write to a user row."""
+    for email in emails:
+        if email:
+            principal_cache.invalidate(email)
+
+# ----------------------------------------------------------
+# Helper: Decode access token claims
+# ----------------------------------------------------------
+def _decode_access_claims(token: str) -> dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         email: str = payload.get("sub")
         exp: int = payload.get("exp")
         if email is None:
@@ -58,25 +136,120 @@ def get_current_user(
                 status_code=401,
                 detail="Access token expired, please refresh your token",
             )
-    except jwt.ExpiredSignatureError:
+    except TokenExpiredError:
         raise HTTPException(
             status_code=401,
             detail="Access token expired, please refresh your token",
         )
-    except JWTError:
+    except TokenError:
         raise HTTPException(status_code=401, detail="Invalid or malformed token")
+    return payload
 
-    user = db.query(User).filter(User.email == email).first()
+
+async def _resolve_principal(db: AsyncSession, email: str) -> tuple[dict, Optional[User]]:
+    """
+    (snapshot, user) for a token subject with one principal cache lookup.
+    `user` is the row loaded on a miss, None on a hit.
+    """
+    snapshot = principal_cache.get(email)
+    if snapshot is not None:
+        return snapshot, None
+
+    user = await db.scalar(select(User).where(func.lower(User.email) == email.lower()))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    snapshot = _snapshot_user(user)
+    principal_cache.set(email, snapshot)
+    return snapshot, user
+
+
+async def _load_user(db: AsyncSession, email: str) -> User:
+    snapshot, user = await _resolve_principal(db, email)
+    return user if user is not None else await _user_from_snapshot(db, snapshot)
+
+
+# ----------------------------------------------------------
+# Helper: Lightweight principal from token claims
+# ----------------------------------------------------------
+class CurrentPrincipal:
+    """
+    The authenticated caller. `id`, `email` and `user_type` come from the
+    principal cache snapshot, so role changes and deletions apply as soon as
+    the user-write paths invalidate it. Routes that need the whole row call
+    `await principal.load_user()`, which rebuilds it from the same snapshot
+    (no query) or returns the row loaded on a cache miss.
+    """
+
+    def __init__(self, db: AsyncSession, email: str, snapshot: dict, user: Optional[User] = None):
+        self._db = db
+        self._snapshot = snapshot
+        self._user = user
+        self.email = email
+        self.id = snapshot["id"]
+        # NULL user_type (rows created outside the API) is the column default
+        self.user_type = UserType(snapshot["user_type"] or UserType.member)
+
+    async def load_user(self) -> User:
+        if self._user is None:
+            self._user = await _user_from_snapshot(self._db, self._snapshot)
+        return self._user
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+) -> CurrentPrincipal:
+    payload = _decode_access_claims(credentials.credentials)
+    email = payload["sub"]
+
+    # Role and existence come from the cached row, not the token, so a
+    # demoted or deleted admin loses access once the write invalidates it
+    snapshot, user = await _resolve_principal(db, email)
+
+    user_id = payload.get("uid")
+    if user_id is not None and user_id != snapshot["id"]:
+        # The account behind this email was deleted and registered again
+        raise HTTPException(status_code=401, detail="Invalid token payload")
+
+    return CurrentPrincipal(db, email, snapshot, user=user)
+
+
+async def require_admin(
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+) -> CurrentPrincipal:
+    # user_type is the cached row's, so no users query on a principal cache hit
+    if current_user.user_type != UserType.admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin can access this endpoint",
+        )
+    return current_user
+
+
+# ----------------------------------------------------------
+# Helper: Get current user (full row) from Access Token
+# ----------------------------------------------------------
+async def get_current_user(
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+) -> User:
+    return await current_user.load_user()
 
 
 # ----------------------------------------------------------
 # GET USER PROFILE
 # ----------------------------------------------------------
 @router.get("/profile", response_model=BaseResponse)
-def get_user_profile(current_user: User = Depends(get_current_user)):
+async def get_user_profile(
+    http_request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+):
+    # updated_at moves on every write to the row (and the principal snapshot is dropped with it)
+    etag = make_etag(current_user.id, current_user.updated_at)
+    if (unchanged := not_modified(http_request, etag, current_user.updated_at)) is not None:
+        return unchanged
+    response.headers.update(validator_headers(etag, current_user.updated_at))
+
     return BaseResponse(
         code=200,
         message="User profile fetched successfully",
@@ -91,7 +264,7 @@ def get_user_profile(current_user: User = Depends(get_current_user)):
 # REGISTER
 # ----------------------------------------------------------
 @router.post("/register", response_model=BaseResponse)
-def register_user(
+async def register_user(
     fullname: str = Form(...),
     username: str = Form(...),
     email: str = Form(...),
@@ -100,31 +273,31 @@ def register_user(
     domisili: Optional[str] = Form(None),
     user_type: Optional[str] = Form("member"),
     image_profile: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    if db.query(User).filter(User.email == email).first():
+    if await db.scalar(select(User.id).where(func.lower(User.email) == email.lower())):
         raise HTTPException(status_code=400, detail="Email already registered")
-    if db.query(User).filter(User.username == username).first():
+    if await db.scalar(select(User.id).where(func.lower(User.username) == username.lower())):
         raise HTTPException(status_code=400, detail="Username already taken")
 
     image_profile_url = ""
     if image_profile:
         from app.utils.cloudinary import upload_image  # local import to avoid circular dependency if any, though top level is fine too
-        image_profile_url = upload_image(image_profile)
+        image_profile_url = await run_in_threadpool(upload_image, image_profile)
 
     new_user = User(
         fullname=fullname,
         username=username,
         email=email,
-        password=hash_password(password),
+        password=await hash_password_async(password),
         phone_number=phone_number,
         domisili=domisili,
         user_type=user_type,
         image_profile_url=image_profile_url,
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return BaseResponse(
         code=200,
@@ -133,26 +306,63 @@ def register_user(
     )
 
 
+# ----------------------------------------------------------
+# Helper: resolve a login identifier through a single index
+# ----------------------------------------------------------
+PHONE_PATTERN = re.compile(r"^\+?[0-9(][0-9\s\-().]{5,24}$")
+
+
+def _phone_digits(identifier: str) -> Optional[str]:
+    # Phones are matched on digits only, so "0812 1111" and "(0812)1111" are the same number
+    if "@" not in identifier and PHONE_PATTERN.match(identifier):
+        return re.sub(r"[^0-9]", "", identifier)
+    return None
+
+
+def login_identifier_key(identifier: str) -> str:
+    """Throttle key for a login identifier, normalized the way find_user_by_identifier matches it."""
+    identifier = identifier.strip()
+    digits = _phone_digits(identifier)
+    return f"phone:{digits}" if digits is not None else identifier.lower()
+
+
+async def find_user_by_identifier(db: AsyncSession, identifier: str) -> Optional[User]:
+    identifier = identifier.strip()
+
+    if "@" in identifier:
+        return await db.scalar(select(User).where(func.lower(User.email) == identifier.lower()).limit(1))
+
+    digits = _phone_digits(identifier)
+    if digits is not None:
+        user = await db.scalar(select(User).where(normalized_phone(User.phone_number) == digits).limit(1))
+        if user:
+            return user
+        # Fall through: an all-digit username is still a valid username
+
+    return await db.scalar(select(User).where(func.lower(User.username) == identifier.lower()).limit(1))
+
+
 # ----------------------------------------------------------
 # LOGIN (email/username/phone) + issue tokens
 # ----------------------------------------------------------
 @router.post("/login", response_model=BaseResponse)
-def login_user(request: UserLogin, db: Session = Depends(get_db)):
-    user = (
-        db.query(User)
-        .filter(
-            (User.email == request.identifier)
-            | (User.username == request.identifier)
-            | (User.phone_number == request.identifier)
-        )
-        .first()
-    )
+async def login_user(request: UserLogin, http_request: Request, db: AsyncSession = Depends(get_db)):
+    client_ip = http_request.client.host if http_request.client else "unknown"
+    throttle_login(client_ip, request.identifier)
+
+    user = await find_user_by_identifier(db, request.identifier)
 
-    if not user or not verify_password(request.password, user.password):
+    if not user or not await verify_password_async(request.password, user.password):
         raise HTTPException(status_code=401, detail="email, username, nomor HP, atau password salah")
 
+    # Transparently upgrade hashes created with outdated argon2 costs
+    if password_needs_rehash(user.password):
+        user.password = await hash_password_async(request.password)
+        await db.commit()
+        invalidate_principal(user.email)
+
     # Create access and refresh tokens
-    access_token = create_access_token({"sub": user.email})
+    access_token = create_access_token(access_token_claims(user))
     refresh_token = create_refresh_token({"sub": user.email})
 
     return BaseResponse(
@@ -170,19 +380,28 @@ def login_user(request: UserLogin, db: Session = Depends(get_db)):
 # LOGOUT - Invalidate Refresh Token
 # ----------------------------------------------------------
 @router.post("/logout", response_model=BaseResponse)
-def logout_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def logout_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+):
     refresh_token = credentials.credentials
 
     try:
-        payload = jwt.decode(refresh_token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_refresh_token(refresh_token)
         email = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid refresh token")
-    except JWTError:
+    except TokenError:
         raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
 
-    # ✅ Add token to blacklist
-    BLACKLISTED_REFRESH_TOKENS.add(refresh_token)
+    # ✅ Revoke until the token would have expired anyway
+    exp = payload.get("exp")
+    expires_at = (
+        datetime.fromtimestamp(exp, tz=timezone.utc)
+        if exp is not None
+        else datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+    await revocation_store.revoke(db, refresh_token_id(refresh_token, payload), expires_at)
 
     return BaseResponse(
         code=200,
@@ -194,14 +413,15 @@ def logout_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
 # FORGOT PASSWORD
 # ----------------------------------------------------------
 @router.post("/forgot-password", response_model=BaseResponse)
-def forgot_password(request: UserForgotPassword, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request.email).first()
+async def forgot_password(request: UserForgotPassword, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(func.lower(User.email) == request.email.lower()))
     if not user:
         raise HTTPException(status_code=404, detail="Email not found")
 
     reset_token = create_access_token({"sub": user.email})
     return BaseResponse(
         code=200,
+        message="Password reset token generated",
         data={"reset_token": reset_token},
     )
 
@@ -209,21 +429,22 @@ def forgot_password(request: UserForgotPassword, db: Session = Depends(get_db)):
 # RESET PASSWORD
 # ----------------------------------------------------------
 @router.post("/reset-password", response_model=BaseResponse)
-def reset_password(request: UserResetPassword, db: Session = Depends(get_db)):
+async def reset_password(request: UserResetPassword, db: AsyncSession = Depends(get_db)):
     try:
-        payload = jwt.decode(request.reset_token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(request.reset_token)
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=400, detail="Invalid token")
-    except JWTError:
+    except TokenError:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
 
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(func.lower(User.email) == email.lower()))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user.password = hash_password(request.new_password)
-    db.commit()
+    user.password = await hash_password_async(request.new_password)
+    await db.commit()
+    invalidate_principal(user.email)
 
     return BaseResponse(
         code=200,
@@ -235,22 +456,27 @@ def reset_password(request: UserResetPassword, db: Session = Depends(get_db)):
 # REFRESH ACCESS TOKEN using Refresh Token
 # ----------------------------------------------------------
 @router.post("/refresh", response_model=BaseResponse)
-def refresh_access_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def refresh_access_token(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+):
     refresh_token = credentials.credentials
 
-    # ✅ Check blacklist
-    if refresh_token in BLACKLISTED_REFRESH_TOKENS:
-        raise HTTPException(status_code=401, detail="Refresh token has been invalidated")
-
     try:
-        payload = jwt.decode(refresh_token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_refresh_token(refresh_token)
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid refresh token")
-    except JWTError:
+    except TokenError:
         raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
 
-    new_access_token = create_access_token({"sub": email})
+    # ✅ Check revocations (DB is only consulted when the local filter matches)
+    if await revocation_store.is_revoked(db, refresh_token_id(refresh_token, payload)):
+        raise HTTPException(status_code=401, detail="Refresh token has been invalidated")
+
+    # Re-read the user so a changed role (or a deleted account) is reflected
+    user = await _load_user(db, email)
+    new_access_token = create_access_token(access_token_claims(user))
 
     return BaseResponse(
         code=200,
@@ -262,17 +488,12 @@ def refresh_access_token(credentials: HTTPAuthorizationCredentials = Depends(sec
 # DELETE USER (Admin only)
 # ----------------------------------------------------------
 @router.delete("/delete/{user_id}", response_model=BaseResponse)
-def delete_user(
+async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
 ):
-    if current_user.user_type != "admin":
-        raise HTTPException(
-            status_code=403, detail="Only admin users can delete other users"
-        )
-
-    user_to_delete = db.query(User).filter(User.id == user_id).first()
+    user_to_delete = await db.get(User, user_id)
     if not user_to_delete:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -281,7 +502,9 @@ def delete_user(
             status_code=400, detail="Admin cannot delete their own account"
         )
 
-    db.delete(user_to_delete)
-    db.commit()
+    deleted_email = user_to_delete.email
+    await db.delete(user_to_delete)
+    await db.commit()
+    invalidate_principal(deleted_email)
 
     return BaseResponse(code=200, message="User deleted successfully", data=None)
\ No newline at end of file
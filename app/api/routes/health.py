@@ -1,4 +1,16 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.api.routes.auth import (
+    CurrentPrincipal,
+    login_throttle_stats,
+    principal_cache,
+    require_admin,
+    revocation_store,
+)
+from app.core.reference_cache import reference_cache
+from app.core.security import access_token_cache, password_pool
+from app.db.instrumentation import route_sql_stats
+from app.db.session import pool_metrics, read_router, replica_pool_metrics
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -6,3 +18,20 @@ router = APIRouter(prefix="/health", tags=["health"])
 @router.get("/live")
 def live_check():
     return {"status": "ok"}
+
+
+# Cache, pool and per-route SQL internals: admins only; /health/live stays public
+@router.get("/metrics")
+def metrics(current_user: CurrentPrincipal = Depends(require_admin)):
+    return {
+        "principal_cache": principal_cache.stats(),
+        "access_token_cache": access_token_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "refresh_token_revocations": revocation_store.stats(),
+        "login_throttle": login_throttle_stats(),
+        "db_pool": pool_metrics.stats(),
+        "db_replica_pool": replica_pool_metrics.stats(),
+        "read_routing": read_router.stats(),
+        "sql_by_route": route_sql_stats.stats(),
+        "reference_cache": reference_cache.stats(),
+    }
@@ -0,0 +1,48 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import get_db
+from app.schemas.user import BaseResponse
+from app.api.routes.auth import CurrentPrincipal, require_admin
+
+router = APIRouter(prefix="/imports", tags=["Imports"])
+
+
+# 📥 BULK IMPORT members or transactions from CSV / JSON (Admin only)
+@router.post("/{kind}", response_model=BaseResponse)
+async def import_rows(
+    kind: Literal["users", "transactions"],
+    file: UploadFile = File(..., description="CSV with a header row, or a .json array of objects"),
+    dry_run: bool = Form(False, description="Validate and report without saving"),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
+):
+    # The CSV / JSON pipeline and its row models load on the first import, not at start-up
+    from app.db.imports import IMPORTERS, read_records, run_import
+
+    # JSON is parsed here and CSV's header read; both block, so off the event loop
+    records = await run_in_threadpool(read_records, file.file, file.filename or "", IMPORTERS[kind].row_model)
+    try:
+        report = await run_import(
+            db,
+            kind,
+            records,
+            reported_by_id=current_user.id,
+            dry_run=dry_run,
+            max_rows=settings.IMPORT_MAX_ROWS,
+        )
+    except IntegrityError:
+        # A row registered concurrently between the checks and the merge
+        raise HTTPException(status_code=409, detail="Conflicting rows were written during the import, please retry")
+
+    verb = "would be imported" if dry_run else "imported"
+    return BaseResponse(
+        code=200,
+        message=f"{report.imported} of {report.rows} {kind} {verb}, {report.failed} rejected",
+        data=report,
+    )
@@ -1,27 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.reference_cache import reference_cache
+from app.db.session import AsyncSessionLocal, get_db
 from app.db.models.payment import Payment
-from app.db.models.user import User
 from app.schemas.payment import PaymentCreate, PaymentOut
 from app.schemas.user import BaseResponse
-from app.api.routes.auth import get_current_user
+from app.utils.conditional import make_etag, not_modified, validator_headers
+from app.api.routes.auth import CurrentPrincipal, get_current_principal, require_admin
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
 
 # 🟢 CREATE Payment
 @router.post("/", response_model=BaseResponse)
-def create_payment(
+async def create_payment(
     request: PaymentCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
 ):
-    # Only admin can create payment
-    if current_user.user_type != "admin":
-        raise HTTPException(status_code=403, detail="Only admin can create payments")
-
-    existing = db.query(Payment).filter(Payment.payment_name == request.payment_name).first()
+    existing = await db.scalar(select(Payment).where(Payment.payment_name == request.payment_name))
     if existing:
         raise HTTPException(status_code=409, detail="Payment name already exists")
 
@@ -30,8 +28,9 @@ def create_payment(
         payment_type=request.payment_type,
     )
     db.add(new_payment)
-    db.commit()
-    db.refresh(new_payment)
+    await db.commit()
+    reference_cache.bump("payments")
+    await db.refresh(new_payment)
 
     return BaseResponse(
         code=200,
@@ -42,23 +41,21 @@ def create_payment(
 
 # 🟠 UPDATE Payment
 @router.put("/{payment_id}", response_model=BaseResponse)
-def update_payment(
+async def update_payment(
     payment_id: int,
     request: PaymentCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
 ):
-    if current_user.user_type != "admin":
-        raise HTTPException(status_code=403, detail="Only admin can update payments")
-
-    payment = db.query(Payment).filter(Payment.id == payment_id).first()
+    payment = await db.get(Payment, payment_id)
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
 
     payment.payment_name = request.payment_name
     payment.payment_type = request.payment_type
-    db.commit()
-    db.refresh(payment)
+    await db.commit()
+    reference_cache.bump("payments")
+    await db.refresh(payment)
 
     return BaseResponse(
         code=200,
@@ -69,35 +66,43 @@ def update_payment(
 
 # 🔴 DELETE Payment
 @router.delete("/{payment_id}", response_model=BaseResponse)
-def delete_payment(
+async def delete_payment(
     payment_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
 ):
-    if current_user.user_type != "admin":
-        raise HTTPException(status_code=403, detail="Only admin can delete payments")
-
-    payment = db.query(Payment).filter(Payment.id == payment_id).first()
+    payment = await db.get(Payment, payment_id)
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
 
-    db.delete(payment)
-    db.commit()
+    await db.delete(payment)
+    await db.commit()
+    reference_cache.bump("payments")
 
     return BaseResponse(code=200, message="Payment deleted successfully", data=None)
 
 
-# 🟡 GET All Payments
-@router.get("/", response_model=BaseResponse)
-def get_all_payments(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    payments = db.query(Payment).order_by(Payment.payment_name.asc()).all()
-    payment_list = [PaymentOut.from_orm(p) for p in payments]
+async def _load_payments() -> bytes:
+    # Primary, not the replica: a reload right after a write must see it
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Payment).order_by(Payment.payment_name.asc()))
+        payment_list = [PaymentOut.from_orm(p) for p in result.scalars().all()]
 
     return BaseResponse(
         code=200,
         message="Payments fetched successfully",
         data=payment_list
-    )
+    ).model_dump_json().encode()
+
+
+# 🟡 GET ALL Payments (pre-encoded body from reference_cache; no DB on a hit)
+@router.get("/", response_model=BaseResponse)
+async def get_all_payments(
+    http_request: Request,
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+):
+    cached = await reference_cache.get("payments", _load_payments)
+    etag = make_etag(cached.digest)
+    if (unchanged := not_modified(http_request, etag)) is not None:
+        return unchanged
+    return Response(content=cached.body, media_type="application/json", headers=validator_headers(etag))
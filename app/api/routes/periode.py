@@ -1,32 +1,27 @@
 # app/api/routes/periode.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.reference_cache import reference_cache
+from app.db.session import AsyncSessionLocal, get_db
 from app.db.models.periode import Periode
 from app.schemas.periode import PeriodeCreate, PeriodeOut
 from app.schemas.user import BaseResponse
-from app.api.routes.auth import get_current_user
-from app.db.models.user import User
+from app.utils.conditional import make_etag, not_modified, validator_headers
+from app.api.routes.auth import CurrentPrincipal, get_current_principal, require_admin
 
 router = APIRouter(prefix="/periodes", tags=["Periodes"])
 
 
 # 🟢 CREATE Periode
 @router.post("/", response_model=BaseResponse)
-def create_periode(
+async def create_periode(
     request: PeriodeCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
 ):
-    # Optional: allow only admin to create periode
-    if current_user.user_type != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admin can create periode."
-        )
-
     # Check duplicate periode_name
-    existing = db.query(Periode).filter(Periode.periode_name == request.periode_name).first()
+    existing = await db.scalar(select(Periode).where(Periode.periode_name == request.periode_name))
     if existing:
         raise HTTPException(status_code=409, detail="Periode name already exists.")
 
@@ -39,8 +34,9 @@ def create_periode(
         end_date=request.end_date,
     )
     db.add(new_periode)
-    db.commit()
-    db.refresh(new_periode)
+    await db.commit()
+    reference_cache.bump("periodes")
+    await db.refresh(new_periode)
 
     return BaseResponse(
         code=200,
@@ -51,16 +47,13 @@ def create_periode(
 
 # 🟠 UPDATE Periode
 @router.put("/{periode_id}", response_model=BaseResponse)
-def update_periode(
+async def update_periode(
     periode_id: int,
     request: PeriodeCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
 ):
-    if current_user.user_type != "admin":
-        raise HTTPException(status_code=403, detail="Only admin can update periode.")
-
-    periode = db.query(Periode).filter(Periode.id == periode_id).first()
+    periode = await db.get(Periode, periode_id)
     if not periode:
         raise HTTPException(status_code=404, detail="Periode not found")
 
@@ -71,8 +64,9 @@ def update_periode(
     periode.start_date = request.start_date
     periode.end_date = request.end_date
 
-    db.commit()
-    db.refresh(periode)
+    await db.commit()
+    reference_cache.bump("periodes")
+    await db.refresh(periode)
 
     return BaseResponse(
         code=200,
@@ -83,35 +77,43 @@ def update_periode(
 
 # 🔴 DELETE Periode
 @router.delete("/{periode_id}", response_model=BaseResponse)
-def delete_periode(
+async def delete_periode(
     periode_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
 ):
-    if current_user.user_type != "admin":
-        raise HTTPException(status_code=403, detail="Only admin can delete periode.")
-
-    periode = db.query(Periode).filter(Periode.id == periode_id).first()
+    periode = await db.get(Periode, periode_id)
     if not periode:
         raise HTTPException(status_code=404, detail="Periode not found")
 
-    db.delete(periode)
-    db.commit()
+    await db.delete(periode)
+    await db.commit()
+    reference_cache.bump("periodes")
 
     return BaseResponse(code=200, message="Periode deleted successfully", data=None)
 
 
-# 🟡 GET ALL Periodes
-@router.get("/", response_model=BaseResponse)
-def get_all_periodes(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    periodes = db.query(Periode).order_by(Periode.start_date.asc()).all()
-    periode_list = [PeriodeOut.from_orm(p) for p in periodes]
+async def _load_periodes() -> bytes:
+    # Primary, not the replica: a reload right after a write must see it
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Periode).order_by(Periode.start_date.asc()))
+        periode_list = [PeriodeOut.from_orm(p) for p in result.scalars().all()]
 
     return BaseResponse(
         code=200,
         message="Periodes fetched successfully",
         data=periode_list
-    )
+    ).model_dump_json().encode()
+
+
+# 🟡 GET ALL Periodes (pre-encoded body from reference_cache; no DB on a hit)
+@router.get("/", response_model=BaseResponse)
+async def get_all_periodes(
+    http_request: Request,
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+):
+    cached = await reference_cache.get("periodes", _load_periodes)
+    etag = make_etag(cached.digest)
+    if (unchanged := not_modified(http_request, etag)) is not None:
+        return unchanged
+    return Response(content=cached.body, media_type="application/json", headers=validator_headers(etag))
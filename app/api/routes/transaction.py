@@ -1,21 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile, Form
-from sqlalchemy.orm import Session, joinedload
-from typing import Optional, List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query, File, UploadFile, Form
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional, List
 from datetime import datetime
 
-from app.db.session import get_db
+from app.db.loaders import transaction_out_options
+from app.db.session import get_db, get_read_db
+from app.db.summaries import (
+    SUMMARY_GROUPS,
+    add_status_move,
+    apply_contribution_delta,
+    apply_contribution_deltas,
+    contribution_totals,
+    move_contribution,
+    summary_source,
+)
 from app.db.models.transaction import Transaction, TransactionStatus
-from app.db.models.user import User
-from app.schemas.transaction import TransactionOut, TransactionCreate, TransactionUpdateStatus
-from app.schemas.user import BaseResponse
-from app.api.routes.auth import get_current_user
+from app.schemas.transaction import (
+    PivotPeriode,
+    PivotRow,
+    TransactionBulkStatusOut,
+    TransactionBulkStatusResult,
+    TransactionBulkStatusUpdate,
+    TransactionCreate,
+    TransactionOut,
+    TransactionPivot,
+    TransactionSummaryRow,
+    TransactionUpdateStatus,
+)
+from app.schemas.user import BaseResponse, PaginatedResponse
+from app.api.routes.auth import CurrentPrincipal, get_current_principal, require_admin
 from app.utils.cloudinary import upload_image
+from app.utils.conditional import make_etag, not_modified, page_validator, validator_headers
+from app.utils.fieldsets import parse_fields, response_model_for
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    approximate_count,
+    keyset_page,
+    next_page_cursor,
+)
 
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
+
+async def _get_transaction_out(db: AsyncSession, transaction_id: int) -> Optional[Transaction]:
+    result = await db.execute(
+        select(Transaction)
+        .options(*transaction_out_options())
+        .where(Transaction.id == transaction_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
 # 🟢 CREATE Transaction
 @router.post("/", response_model=BaseResponse)
-def create_transaction(
+async def create_transaction(
     userId: int = Form(...),
     reportedByUserId: Optional[int] = Form(None),
     amount: float = Form(...),
@@ -23,11 +65,11 @@ def create_transaction(
     periode_id: Optional[int] = Form(None),
     payment_id: Optional[int] = Form(None),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
 ):
     # Upload image
-    image_url = upload_image(file)
+    image_url = await run_in_threadpool(upload_image, file)
 
     new_transaction = Transaction(
         amount=amount,
@@ -39,8 +81,12 @@ def create_transaction(
         user_id=userId,
     )
     db.add(new_transaction)
-    db.commit()
-    db.refresh(new_transaction)
+    await db.flush()
+    await apply_contribution_delta(
+        db, new_transaction.user_id, new_transaction.periode_id, new_transaction.status, 1, new_transaction.amount
+    )
+    await db.commit()
+    new_transaction = await _get_transaction_out(db, new_transaction.id)
 
     return BaseResponse(
         code=200,
@@ -51,23 +97,23 @@ def create_transaction(
 
 # 🟠 UPDATE STATUS (Admin only)
 @router.put("/{transaction_id}/status", response_model=BaseResponse)
-def update_transaction_status(
+async def update_transaction_status(
     transaction_id: int,
     request: TransactionUpdateStatus,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
 ):
-    if current_user.user_type != "admin":
-        raise HTTPException(status_code=403, detail="Only admin can update transaction status")
-
-    transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
+    # Row lock: concurrent status changes must not both move it out of the same old status
+    transaction = await db.get(Transaction, transaction_id, with_for_update=True)
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
+    old_status = transaction.status
     transaction.status = request.status
     transaction.confirmed_by_id = current_user.id
-    db.commit()
-    db.refresh(transaction)
+    await move_contribution(db, transaction, old_status)
+    await db.commit()
+    transaction = await _get_transaction_out(db, transaction_id)
 
     return BaseResponse(
         code=200,
@@ -76,65 +122,234 @@ def update_transaction_status(
     )
 
 
-# 🟡 GET ALL Transactions (with multiple filters)
-@router.get("/", response_model=BaseResponse)
-def get_all_transactions(
-    periode_id: Optional[int] = Query(None),
-    status: Optional[TransactionStatus] = Query(None),
-    payment_id: Optional[int] = Query(None),
-    user_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+# 🟠 BULK UPDATE STATUS (Admin only): one locking CTE + UPDATE ... RETURNING statement per batch
+@router.put("/status", response_model=BaseResponse)
+async def bulk_update_transaction_status(
+    request: TransactionBulkStatusUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
 ):
-    query = (
-        db.query(Transaction)
-        .options(
-            joinedload(Transaction.reported_by),
-            joinedload(Transaction.confirmed_by),
-            joinedload(Transaction.payment),
-            joinedload(Transaction.periode),
+    new_status = TransactionStatus(request.status.value)
+
+    # Lock the target rows in id order (no deadlock against concurrent single-row updates)
+    # and remember their status before the update
+    targets = (
+        select(Transaction.id, Transaction.status.label("old_status"))
+        .order_by(Transaction.id)
+        .with_for_update()
+    )
+    if request.ids is not None:
+        targets = targets.where(Transaction.id.in_(request.ids))
+    else:
+        targets = targets.where(Transaction.periode_id == request.periode_id)
+        if request.current_status is not None:
+            targets = targets.where(Transaction.status == request.current_status)
+    targets = targets.cte("targets")
+
+    # Rows already in the new status keep their confirmed_by_id and updated_at (and ETags)
+    updated = (
+        update(Transaction)
+        .where(Transaction.id == targets.c.id, targets.c.old_status != new_status)
+        .values(status=new_status, confirmed_by_id=current_user.id)
+        .returning(Transaction.id, Transaction.user_id, Transaction.periode_id, Transaction.amount)
+        .cte("updated")
+    )
+    result = await db.execute(
+        select(
+            targets.c.id,
+            targets.c.old_status,
+            updated.c.id.is_not(None).label("changed"),
+            updated.c.user_id,
+            updated.c.periode_id,
+            updated.c.amount,
+        )
+        .select_from(targets.outerjoin(updated, updated.c.id == targets.c.id))
+        .order_by(targets.c.id)
+    )
+    rows = result.all()
+
+    deltas: dict = {}
+    for row in rows:
+        if row.changed:
+            add_status_move(deltas, row.user_id, row.periode_id, row.old_status, new_status, row.amount)
+    await apply_contribution_deltas(db, deltas)
+    await db.commit()
+
+    results = [
+        TransactionBulkStatusResult(
+            id=row.id,
+            outcome="updated" if row.changed else "unchanged",
+            old_status=row.old_status.value,
         )
+        for row in rows
+    ]
+    if request.ids is not None:
+        found = {row.id for row in rows}
+        results += [
+            TransactionBulkStatusResult(id=transaction_id, outcome="not_found")
+            for transaction_id in dict.fromkeys(request.ids)
+            if transaction_id not in found
+        ]
+
+    data = TransactionBulkStatusOut(
+        status=request.status,
+        updated=sum(result.outcome == "updated" for result in results),
+        unchanged=sum(result.outcome == "unchanged" for result in results),
+        not_found=sum(result.outcome == "not_found" for result in results),
+        results=results,
     )
+    return BaseResponse(code=200, message=f"{data.updated} transaction(s) updated to {new_status.value}", data=data)
 
+
+# 🟡 GET ALL Transactions (with multiple filters, newest first, cursor-paginated)
+@router.get("/", response_model=PaginatedResponse)
+async def get_all_transactions(
+    http_request: Request,
+    response: Response,
+    periode_id: Optional[int] = Query(None),
+    status_filter: Optional[TransactionStatus] = Query(None, alias="status"),
+    payment_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None, description="Transactions reported by this user"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Add an approximate total from planner statistics"),
+    fields: Optional[str] = Query(None, description="Comma-separated TransactionOut fields, e.g. id,amount,status"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+):
+    selected = parse_fields(fields, TransactionOut)
+    out_model = response_model_for(TransactionOut, selected)
+    query = select(Transaction)
+
+    # The listing is the submission history: scoped by who reported each
+    # transfer (an admin may report on a member's behalf), unlike the summary,
+    # which totals contributions by the member credited (user_id)
     if current_user.user_type != "admin":
-        query = query.filter(Transaction.reported_by_id == current_user.id)
+        query = query.where(Transaction.reported_by_id == current_user.id)
     elif user_id is not None:
         # If admin AND user_id is provided, filter by that user
-        query = query.filter(Transaction.reported_by_id == user_id)
+        query = query.where(Transaction.reported_by_id == user_id)
 
     if periode_id is not None:
-        query = query.filter(Transaction.periode_id == periode_id)
-    if status is not None:
-        query = query.filter(Transaction.status == status)
+        query = query.where(Transaction.periode_id == periode_id)
+    if status_filter is not None:
+        query = query.where(Transaction.status == status_filter)
     if payment_id is not None:
-        query = query.filter(Transaction.payment_id == payment_id)
+        query = query.where(Transaction.payment_id == payment_id)
 
-    transactions = query.order_by(Transaction.created_at.desc()).all()
+    sort_key = (Transaction.created_at, Transaction.id)
+    page_query = keyset_page(query, sort_key, cursor, limit, sort="newest")
 
-    data = [TransactionOut.from_orm(t) for t in transactions]
+    # Conditional GET: (id, updated_at) of the page window decides whether the page can have changed
+    validator = await page_validator(db, page_query, Transaction.id, Transaction.updated_at)
+    etag = make_etag(validator, http_request.url.query, current_user.id)
+    if (unchanged := not_modified(http_request, etag)) is not None:
+        return unchanged
+    response.headers.update(validator_headers(etag))
 
-    return BaseResponse(
+    result = await db.execute(page_query.options(*transaction_out_options(selected)))
+    transactions, next_cursor = next_page_cursor(result.scalars().all(), limit, sort_key, "newest")
+
+    data = [out_model.from_orm(t) for t in transactions]
+
+    return PaginatedResponse(
         code=200,
         message="Transactions fetched successfully",
         data=data,
+        next_cursor=next_cursor,
+        approximate_total=await approximate_count(db, query) if include_total else None,
+    )
+
+
+def _summary_scope(query, source, current_user: CurrentPrincipal, user_id: Optional[int], periode_id: Optional[int], status_filter: Optional[TransactionStatus]):
+    # source: Transaction or ContributionSummary (same user_id / periode_id / status columns).
+    # Totals belong to the member credited (user_id), including transfers an admin
+    # reported for them; contribution_summaries has no reporter to scope by
+    if current_user.user_type != "admin":
+        # Members only see their own contributions
+        query = query.where(source.user_id == current_user.id)
+    elif user_id is not None:
+        query = query.where(source.user_id == user_id)
+    if periode_id is not None:
+        query = query.where(source.periode_id == periode_id)
+    if status_filter is not None:
+        query = query.where(source.status == status_filter)
+    return query
+
+
+# 📊 SUMMARY: totals grouped by user / periode / status / payment
+@router.get("/summary", response_model=BaseResponse)
+async def get_transaction_summary(
+    group_by: str = Query("user,periode", description="Comma-separated: user, periode, status, payment"),
+    periode_id: Optional[int] = Query(None),
+    status_filter: Optional[TransactionStatus] = Query(None, alias="status"),
+    user_id: Optional[int] = Query(None, description="Contributions credited to this member"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+):
+    groups = tuple(dict.fromkeys(name.strip() for name in group_by.split(",") if name.strip()))
+    unknown = [name for name in groups if name not in SUMMARY_GROUPS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown group_by: {', '.join(unknown)}. Allowed: {', '.join(SUMMARY_GROUPS)}",
+        )
+
+    query = _summary_scope(contribution_totals(groups), summary_source(groups), current_user, user_id, periode_id, status_filter)
+    result = await db.execute(query)
+    data = [TransactionSummaryRow.model_validate(row._mapping) for row in result]
+
+    return BaseResponse(code=200, message="Transaction summary fetched successfully", data=data)
+
+
+# 📊 PIVOT: members x periodes matrix for the admin dashboard
+@router.get("/summary/pivot", response_model=BaseResponse)
+async def get_transaction_pivot(
+    value: Literal["completed_amount", "total_amount", "pending_amount", "count"] = Query("completed_amount"),
+    status_filter: Optional[TransactionStatus] = Query(None, alias="status"),
+    user_id: Optional[int] = Query(None, description="Contributions credited to this member"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+):
+    groups = ("user", "periode")
+    query = _summary_scope(contribution_totals(groups), summary_source(groups), current_user, user_id, None, status_filter)
+    result = await db.execute(query)
+
+    periodes: dict = {}
+    rows: dict[int, PivotRow] = {}
+    for row in result:
+        periodes.setdefault(row.periode_id, PivotPeriode(id=row.periode_id, periode_name=row.periode_name))
+        pivot_row = rows.setdefault(
+            row.user_id,
+            PivotRow(user_id=row.user_id, user_fullname=row.user_fullname, values={}, total=0),
+        )
+        amount = float(getattr(row, value))
+        pivot_row.values[str(row.periode_id) if row.periode_id is not None else "none"] = amount
+        pivot_row.total += amount
+
+    data = TransactionPivot(
+        value=value,
+        periodes=sorted(periodes.values(), key=lambda periode: (periode.id is None, periode.id or 0)),
+        rows=list(rows.values()),
     )
+    return BaseResponse(code=200, message="Transaction pivot fetched successfully", data=data)
 
 
 # 🔴 DELETE Transaction (Admin only)
 @router.delete("/{transaction_id}", response_model=BaseResponse)
-def delete_transaction(
+async def delete_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
 ):
-    if current_user.user_type != "admin":
-        raise HTTPException(status_code=403, detail="Only admin can delete transactions")
-
-    transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
+    transaction = await db.get(Transaction, transaction_id, with_for_update=True)
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
-    db.delete(transaction)
-    db.commit()
+    await apply_contribution_delta(
+        db, transaction.user_id, transaction.periode_id, transaction.status, -1, -transaction.amount
+    )
+    await db.delete(transaction)
+    await db.commit()
 
     return BaseResponse(code=200, message="Transaction deleted successfully", data=None)
@@ -1,58 +1,106 @@
 # app/api/routes/user.py
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, File, UploadFile, Form, Query
+from fastapi.concurrency import run_in_threadpool
 from starlette.datastructures import UploadFile as StarletteUploadFile
-from sqlalchemy.orm import Session
-from typing import List, Union
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Union
 from typing import Optional
 
-from app.db.session import get_db
-from app.db.models.user import User
-from app.schemas.user import UserResponse, BaseResponse, UserUpdate, UserChangePassword
-from app.api.routes.auth import get_current_user
-from app.core.security import hash_password, verify_password
+from app.db.session import get_db, get_read_db
+from app.db.models.user import User, UserType
+from app.schemas.user import UserResponse, BaseResponse, PaginatedResponse, UserUpdate, UserChangePassword
+from app.api.routes.auth import (
+    CurrentPrincipal,
+    get_current_principal,
+    get_current_user,
+    invalidate_principal,
+    require_admin,
+)
+from app.core.security import hash_password_async, verify_password_async
 from app.utils.cloudinary import upload_image
+from app.utils.conditional import make_etag, not_modified, page_validator, validator_headers
+from app.utils.fieldsets import load_only_columns, parse_fields, response_model_for
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    approximate_count,
+    keyset_page,
+    next_page_cursor,
+)
 
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-# 🟡 GET ALL USERS (Admin only)
-@router.get("/", response_model=BaseResponse)
-def get_all_users(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+# Sort orders for the member list: (key columns, descending). Each ends in id so
+# keyset cursors are unique, and each has a matching index on users.
+USER_SORTS = {
+    "newest": ((User.created_at, User.id), True),
+    "oldest": ((User.created_at, User.id), False),
+    "name": ((User.fullname, User.id), False),
+}
+
+
+# 🟡 GET ALL USERS (Admin only, filtered, cursor-paginated)
+@router.get("/", response_model=PaginatedResponse)
+async def get_all_users(
+    http_request: Request,
+    response: Response,
+    user_type: Optional[UserType] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    domisili: Optional[str] = Query(None, description="Case-insensitive exact match"),
+    sort: Literal["newest", "oldest", "name"] = Query("newest"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Add an approximate total from planner statistics"),
+    fields: Optional[str] = Query(None, description="Comma-separated UserResponse fields, e.g. id,fullname"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
 ):
-    # Restrict access to admin only
-    if current_user.user_type != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admin can access this endpoint"
-        )
+    selected = parse_fields(fields, UserResponse)
+    out_model = response_model_for(UserResponse, selected)
+    query = select(User)
+    if user_type is not None:
+        query = query.where(User.user_type == user_type)
+    if is_active is not None:
+        query = query.where(User.is_active.is_(is_active))
+    if domisili and domisili.strip():
+        query = query.where(func.lower(User.domisili) == domisili.strip().lower())
 
-    users = db.query(User).order_by(User.created_at.desc()).all()
-    user_list = [UserResponse.from_orm(u) for u in users]
+    sort_key, descending = USER_SORTS[sort]
+    page_query = keyset_page(query, sort_key, cursor, limit, descending=descending, sort=sort)
 
-    return BaseResponse(
+    # Conditional GET: (id, updated_at) of the page window decides whether the page can have changed
+    validator = await page_validator(db, page_query, User.id, User.updated_at)
+    etag = make_etag(validator, http_request.url.query, current_user.id)
+    if (unchanged := not_modified(http_request, etag)) is not None:
+        return unchanged
+    response.headers.update(validator_headers(etag))
+
+    if selected is not None:
+        page_query = page_query.options(load_only_columns(User, selected, sort_key))
+    result = await db.execute(page_query)
+    users, next_cursor = next_page_cursor(result.scalars().all(), limit, sort_key, sort)
+    user_list = [out_model.from_orm(u) for u in users]
+
+    return PaginatedResponse(
         code=200,
         message="Users fetched successfully",
-        data=user_list
+        data=user_list,
+        next_cursor=next_cursor,
+        approximate_total=await approximate_count(db, query) if include_total else None,
     )
 
 
 # 🟢 GET SINGLE USER BY ID (Admin only)
 @router.get("/{user_id}", response_model=BaseResponse)
-def get_user_by_id(
+async def get_user_by_id(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
 ):
-    if current_user.user_type != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admin can access this endpoint"
-        )
-
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -64,7 +112,7 @@ def get_user_by_id(
 
 # ✏️ UPDATE USER (Admin OR Self)
 @router.put("/{user_id}", response_model=BaseResponse)
-def update_user(
+async def update_user(
     user_id: int,
     fullname: Optional[str] = Form(None),
     username: Optional[str] = Form(None),
@@ -74,11 +122,11 @@ def update_user(
     domisili: Optional[str] = Form(None),
     password: Optional[str] = Form(None),
     image_profile: Union[UploadFile, str, None] = File(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
 ):
     # Fetch user to update
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -89,6 +137,8 @@ def update_user(
             detail="You are not allowed to update this user"
         )
 
+    previous_email = user.email
+
     # Restrict sensitive fields for non-admin
     if current_user.user_type != "admin":
         user_type = None
@@ -101,14 +151,18 @@ def update_user(
     if username and username.strip():
         # Check if username exists (if changed)
         if user.username != username:
-            existing_user = db.query(User).filter(User.username == username).first()
+            existing_user = await db.scalar(
+                select(User.id).where(func.lower(User.username) == username.lower(), User.id != user.id)
+            )
             if existing_user:
                  raise HTTPException(status_code=400, detail="Username already registered")
         user.username = username
     if email and email.strip():
          # Check if email exists (if changed)
         if user.email != email:
-            existing_user = db.query(User).filter(User.email == email).first()
+            existing_user = await db.scalar(
+                select(User.id).where(func.lower(User.email) == email.lower(), User.id != user.id)
+            )
             if existing_user:
                  raise HTTPException(status_code=400, detail="Email already registered")
         user.email = email
@@ -119,14 +173,15 @@ def update_user(
     if domisili and domisili.strip():
         user.domisili = domisili
     if password and password.strip():
-        user.password = hash_password(password)
+        user.password = await hash_password_async(password)
 
     if isinstance(image_profile, (UploadFile, StarletteUploadFile)) and image_profile.filename:
-        image_url = upload_image(image_profile)
+        image_url = await run_in_threadpool(upload_image, image_profile)
         user.image_profile_url = image_url
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(previous_email, user.email)
 
     return BaseResponse(
         code=200,
@@ -137,7 +192,7 @@ def update_user(
 
 # 🟢 UPDATE OWN PROFILE
 @router.put("/me/update", response_model=BaseResponse)
-def update_own_profile(
+async def update_own_profile(
     fullname: Optional[str] = Form(None),
     username: Optional[str] = Form(None),
     email: Optional[str] = Form(None),
@@ -145,22 +200,27 @@ def update_own_profile(
     domisili: Optional[str] = Form(None),
     password: Optional[str] = Form(None),
     image_profile: Union[UploadFile, str, None] = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     user = current_user
+    previous_email = user.email
 
     if fullname and fullname.strip():
         user.fullname = fullname
     if username and username.strip():
         if user.username != username:
-             existing_user = db.query(User).filter(User.username == username).first()
+             existing_user = await db.scalar(
+                 select(User.id).where(func.lower(User.username) == username.lower(), User.id != user.id)
+             )
              if existing_user:
                  raise HTTPException(status_code=400, detail="Username already registered")
         user.username = username
     if email and email.strip():
         if user.email != email:
-             existing_user = db.query(User).filter(User.email == email).first()
+             existing_user = await db.scalar(
+                 select(User.id).where(func.lower(User.email) == email.lower(), User.id != user.id)
+             )
              if existing_user:
                  raise HTTPException(status_code=400, detail="Email already registered")
         user.email = email
@@ -169,14 +229,15 @@ def update_own_profile(
     if domisili and domisili.strip():
         user.domisili = domisili
     if password and password.strip():
-        user.password = hash_password(password)
+        user.password = await hash_password_async(password)
     
     if isinstance(image_profile, (UploadFile, StarletteUploadFile)) and image_profile.filename:
-        image_url = upload_image(image_profile)
+        image_url = await run_in_threadpool(upload_image, image_profile)
         user.image_profile_url = image_url
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(previous_email, user.email)
 
     return BaseResponse(
         code=200,
@@ -187,39 +248,38 @@ def update_own_profile(
 
 # ❌ DELETE USER (Admin only)
 @router.delete("/{user_id}", response_model=BaseResponse)
-def delete_user(
+async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(require_admin),
 ):
-    if current_user.user_type != "admin":
-        raise HTTPException(status_code=403, detail="Only admin can delete users")
-
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    db.delete(user)
-    db.commit()
-
+    deleted_email = user.email
+    await db.delete(user)
+    await db.commit()
+    invalidate_principal(deleted_email)
 
     return BaseResponse(code=200, message="User deleted successfully", data=None)
 
 
 # 🔒 CHANGE PASSWORD
 @router.post("/me/change-password", response_model=BaseResponse)
-def change_password(
+async def change_password(
     password_data: UserChangePassword,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.password):
+    if not await verify_password_async(password_data.current_password, current_user.password):
         raise HTTPException(status_code=400, detail="Password saat ini salah")
     
     # Update password
-    current_user.password = hash_password(password_data.new_password)
-    db.commit()
+    current_user.password = await hash_password_async(password_data.new_password)
+    await db.commit()
+    invalidate_principal(current_user.email)
     
     return BaseResponse(
         code=200,
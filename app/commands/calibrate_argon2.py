@@ -0,0 +1,118 @@
+# app/commands/calibrate_argon2.py
+"""
+Benchmark argon2 costs on this host and pick settings that hit a target
+verify latency.
+
+    python -m app.commands.calibrate_argon2 --target-ms 250
+    python -m app.commands.calibrate_argon2 --target-ms 250 --write .env
+
+Run it on the same instance size the API is deployed on.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from passlib.hash import argon2
+
+# OWASP minimums: 19 MiB with t=2, or 46 MiB and up with t=1
+MEMORY_COSTS_KIB = [19456, 32768, 47104, 65536, 131072, 262144]
+OWASP_T1_MEMORY_KIB = 47104
+MAX_TIME_COST = 10
+SAMPLE_PASSWORD = "calibrate-argon2-Password!"
+
+
+def measure_verify_ms(time_cost: int, memory_cost: int, parallelism: int, samples: int) -> float:
+    handler = argon2.using(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    hashed = handler.hash(SAMPLE_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.verify(SAMPLE_PASSWORD, hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def owasp_min_time_cost(memory_cost: int) -> int:
+    return 1 if memory_cost >= OWASP_T1_MEMORY_KIB else 2
+
+
+def calibrate(target_ms: float, parallelism: int, samples: int, min_time_cost: int) -> Optional[dict]:
+    """
+    Prefer the largest memory cost that still fits `min_time_cost` (never
+    below the OWASP minimum for that memory) under the target, then raise
+    time_cost as far as the budget allows. None when even the OWASP floor
+    is over the target.
+    """
+    best = None
+    for memory_cost in MEMORY_COSTS_KIB:
+        time_cost = max(min_time_cost, owasp_min_time_cost(memory_cost))
+        elapsed = measure_verify_ms(time_cost, memory_cost, parallelism, samples)
+        print(f"  m={memory_cost:>6} KiB t={time_cost} p={parallelism}: {elapsed:7.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = {"time_cost": time_cost, "memory_cost": memory_cost, "verify_ms": elapsed}
+
+    if best is None:
+        return None
+
+    for time_cost in range(best["time_cost"] + 1, MAX_TIME_COST + 1):
+        elapsed = measure_verify_ms(time_cost, best["memory_cost"], parallelism, samples)
+        print(f"  m={best['memory_cost']:>6} KiB t={time_cost} p={parallelism}: {elapsed:7.1f} ms")
+        if elapsed > target_ms:
+            break
+        best.update(time_cost=time_cost, verify_ms=elapsed)
+
+    best["parallelism"] = parallelism
+    return best
+
+
+def write_env(path: Path, values: dict) -> None:
+    lines = path.read_text().splitlines() if path.exists() else []
+    remaining = dict(values)
+    for index, line in enumerate(lines):
+        key = line.split("=", 1)[0].strip()
+        if key in remaining:
+            lines[index] = f"{key}={remaining.pop(key)}"
+    lines.extend(f"{key}={value}" for key, value in remaining.items())
+    path.write_text("\n".join(lines) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="target median verify latency")
+    parser.add_argument("--parallelism", type=int, default=min(os.cpu_count() or 1, 4))
+    parser.add_argument("--min-time-cost", type=int, default=2)
+    parser.add_argument("--samples", type=int, default=5, help="verifications per measurement")
+    parser.add_argument("--write", metavar="ENV_FILE", help="update ARGON2_* keys in this env file")
+    args = parser.parse_args()
+
+    print(f"Calibrating argon2 for a {args.target_ms:.0f} ms verify target...")
+    result = calibrate(args.target_ms, args.parallelism, args.samples, args.min_time_cost)
+    if result is None:
+        # Writing anything cheaper would fall below the OWASP minimum
+        sys.exit(
+            f"No argon2 setting at or above the OWASP minimum (m={MEMORY_COSTS_KIB[0]} KiB, t=2) "
+            f"verifies within {args.target_ms:.0f} ms on this host. Raise --target-ms or use a "
+            f"larger instance." + (f" {args.write} was not changed." if args.write else "")
+        )
+
+    values = {
+        "ARGON2_TIME_COST": result["time_cost"],
+        "ARGON2_MEMORY_COST": result["memory_cost"],
+        "ARGON2_PARALLELISM": result["parallelism"],
+    }
+    print(f"\nSelected (median verify {result['verify_ms']:.1f} ms):")
+    for key, value in values.items():
+        print(f"{key}={value}")
+
+    if args.write:
+        write_env(Path(args.write), values)
+        print(f"\nWrote {args.write}. Existing hashes are upgraded on the next successful login.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# app/commands/import_data.py
+"""
+Bulk import members or transactions from CSV / JSON, same rules as
+POST /imports/{kind} but without the per-request row limit:
+
+    python -m app.commands.import_data users members.csv
+    python -m app.commands.import_data transactions history.csv --reported-by 1
+    python -m app.commands.import_data users members.json --dry-run --workers 8
+
+Password hashing gets its own process pool (--workers, default: every core),
+so a large member import is not throttled to the API's PASSWORD_POOL_WORKERS.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from typing import BinaryIO
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.password_pool import PasswordPool
+from app.db.imports import IMPORTERS, read_records, run_import
+from app.db.session import AsyncSessionLocal, async_engine
+
+
+async def _run(args, stream: BinaryIO, pool: PasswordPool):
+    records = await run_in_threadpool(read_records, stream, args.path, IMPORTERS[args.kind].row_model)
+    async with AsyncSessionLocal() as db:
+        report = await run_import(
+            db,
+            args.kind,
+            records,
+            reported_by_id=args.reported_by,
+            dry_run=args.dry_run,
+            pool=pool,
+        )
+    await async_engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=sorted(IMPORTERS))
+    parser.add_argument("path", help="CSV with a header row, or a .json array of objects")
+    parser.add_argument("--reported-by", type=int, help="Admin user id recorded as reporter (transactions)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report without saving")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Password hashing processes")
+    args = parser.parse_args()
+
+    if IMPORTERS[args.kind].needs_reporter and args.reported_by is None:
+        parser.error(f"{args.kind} imports need --reported-by")
+
+    pool = PasswordPool(workers=args.workers, max_pending=max(args.workers, 1) * 2)
+    try:
+        # Opened here, outside the event loop; run_import reads it in the threadpool
+        with open(args.path, "rb") as stream:
+            report = asyncio.run(_run(args, stream, pool))
+    except HTTPException as exc:
+        sys.exit(f"Import failed: {exc.detail}")
+    finally:
+        pool.shutdown()
+
+    for error in report.errors:
+        print(f"row {error.row}: {error.field or '-'}: {error.message}")
+    if report.errors_truncated:
+        print("... more errors not shown")
+    prefix = "Dry run: " if report.dry_run else ""
+    print(f"{prefix}{report.imported} of {report.rows} {report.kind} imported, {report.failed} rejected")
+    sys.exit(1 if report.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
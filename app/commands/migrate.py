@@ -0,0 +1,39 @@
+# app/commands/migrate.py
+"""
+Bring the database schema up to date. Run once per deploy, not per worker:
+
+    python -m app.commands.migrate
+
+An empty database gets the full schema from the models and is stamped at the
+Alembic head (the first revisions assume the tables already exist); an
+existing one is upgraded with `alembic upgrade head`.
+"""
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.models import User  # registers every model on Base.metadata
+from app.db.session import engine
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def main():
+    config = Config(str(ALEMBIC_INI))
+    # Same database as the app, even when DATABASE_URL only lives in .env
+    config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
+    if not inspect(engine).has_table(User.__tablename__):
+        print("Empty database: creating schema from models")
+        Base.metadata.create_all(bind=engine)
+        command.stamp(config, "head")
+    else:
+        command.upgrade(config, "head")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# app/commands/rebuild_contribution_summaries.py
+"""
+Recompute contribution_summaries from the transactions table and report any
+drift (rows edited outside the API, manual SQL fixes, restores):
+
+    python -m app.commands.rebuild_contribution_summaries [--dry-run]
+
+On PostgreSQL, transactions is locked in SHARE mode for the duration, so
+reads carry on but writes wait until the rebuild commits.
+"""
+import argparse
+
+from sqlalchemy import delete, func, insert, select, text
+
+from app.db.models.contribution_summary import ContributionSummary
+from app.db.session import SessionLocal
+from app.db.summaries import CONTRIBUTION_TOTALS_FROM_TRANSACTIONS
+
+
+def _key(user_id, periode_id, status):
+    return user_id, periode_id or 0, status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Only report drift")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if db.bind.dialect.name == "postgresql":
+            db.execute(text("LOCK TABLE transactions IN SHARE MODE"))
+
+        expected = {
+            _key(row.user_id, row.periode_id, row.status): (row.count, row.total_amount)
+            for row in db.execute(CONTRIBUTION_TOTALS_FROM_TRANSACTIONS)
+        }
+        current = {
+            _key(row.user_id, row.periode_id, row.status): (row.count, row.total_amount)
+            for row in db.execute(
+                select(
+                    ContributionSummary.user_id,
+                    ContributionSummary.periode_id,
+                    ContributionSummary.status,
+                    ContributionSummary.count,
+                    ContributionSummary.total_amount,
+                ).where(ContributionSummary.count != 0)
+            )
+        }
+
+        drift = sorted(
+            (key, current.get(key), expected.get(key))
+            for key in expected.keys() | current.keys()
+            if current.get(key) != expected.get(key)
+        )
+        for (user_id, periode_id, status), found, wanted in drift:
+            print(f"user={user_id} periode={periode_id or None} status={status.value}: {found} -> {wanted}")
+        print(f"{len(drift)} drifted row(s), {len(expected)} expected row(s)")
+
+        if args.dry_run:
+            db.rollback()
+            return
+
+        db.execute(delete(ContributionSummary))
+        db.execute(
+            insert(ContributionSummary).from_select(
+                ["user_id", "periode_id", "status", "count", "total_amount"],
+                CONTRIBUTION_TOTALS_FROM_TRANSACTIONS,
+            )
+        )
+        db.commit()
+        print(f"Rebuilt contribution_summaries: {db.scalar(select(func.count()).select_from(ContributionSummary))} row(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
+from typing import Optional
 
 class Settings(BaseSettings):
     APP_NAME: str = "Talangraga Backend"
@@ -7,17 +8,97 @@ class Settings(BaseSettings):
     API_PREFIX: str = "/api"
 
     DATABASE_URL: str
+    # Optional override; derived from DATABASE_URL (asyncpg driver) when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool (request engine). DB_POOL_MODE:
+    #   "queue" - keep up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections open
+    #   "null"  - open/close per checkout; use behind PgBouncer transaction pooling
+    DB_POOL_MODE: str = "queue"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; below the server/proxy idle timeout
+    DB_POOL_PRE_PING: bool = True
+
+    # Read replica for read-only endpoints (get_read_db); unset = primary only.
+    # Reads fall back to the primary while the replica lags more than
+    # REPLICA_MAX_LAG_SECONDS (0 = no lag check) and, for READ_YOUR_WRITES_SECONDS
+    # after a successful write, for the client that made it.
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 10
+    REPLICA_LAG_CHECK_SECONDS: float = 5
+    READ_YOUR_WRITES_SECONDS: float = 5
+
+    # Per-request SQL instrumentation (Server-Timing header, per-route totals in
+    # /health/metrics); requests slower than SLOW_REQUEST_MS log their statements
+    SQL_TIMING_ENABLED: bool = True
+    SLOW_REQUEST_MS: float = 1000  # 0 = no slow-request log
+
+    # Raise on any lazy load the loader policies in app/db/loaders.py did not
+    # plan for (N+1 guard). Unset = on when ENV is dev or test.
+    STRICT_LOADING: Optional[bool] = None
     SECRET_KEY: str
     REFRESH_SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
 
+    # JWT backend ("jose" or "pyjwt") and key rotation.
+    # HS* algorithms sign with SECRET_KEY; ES256/EdDSA sign with JWT_PRIVATE_KEY (PEM).
+    # *_VERIFICATION_KEYS map old key ids to secrets / public PEMs that are still accepted.
+    JWT_BACKEND: str = "jose"
+    JWT_KEY_ID: str = "access-1"
+    JWT_PRIVATE_KEY: Optional[str] = None
+    JWT_VERIFICATION_KEYS: dict[str, str] = {}
+    JWT_REFRESH_KEY_ID: str = "refresh-1"
+    JWT_REFRESH_VERIFICATION_KEYS: dict[str, str] = {}
+
     # Cloudinary
     CLOUDINARY_CLOUD_NAME: str
     CLOUDINARY_API_KEY: str
     CLOUDINARY_API_SECRET: str
 
+    # Principal cache (get_current_user)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 1024
+
+    # Verified access-token cache (skips repeated JWT signature checks)
+    ACCESS_TOKEN_CACHE_MAX_SIZE: int = 4096
+
+    # Refresh-token revocation store (Postgres + per-worker Bloom filter)
+    REVOCATION_FILTER_CAPACITY: int = 100_000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.01
+    REVOCATION_SYNC_SECONDS: int = 5
+    REVOCATION_PURGE_SECONDS: int = 3600
+
+    # Login throttle (token buckets, checked before argon2 verification)
+    LOGIN_RATE_IP_BURST: int = 20
+    LOGIN_RATE_IP_PER_MINUTE: float = 10
+    LOGIN_RATE_IDENTIFIER_BURST: int = 5
+    LOGIN_RATE_IDENTIFIER_PER_MINUTE: float = 3
+    # "memory" (per worker) or "package.module:factory" returning a shared RateLimitBackend
+    LOGIN_RATE_BACKEND: str = "memory"
+
+    # Password hashing process pool (0 workers = hash inline)
+    PASSWORD_POOL_WORKERS: int = 2
+    PASSWORD_POOL_MAX_PENDING: int = 32
+
+    # Argon2 cost (unset = passlib defaults). Generate with:
+    #   python -m app.commands.calibrate_argon2 --target-ms 250 --write .env
+    ARGON2_TIME_COST: Optional[int] = None
+    ARGON2_MEMORY_COST: Optional[int] = None  # KiB
+    ARGON2_PARALLELISM: Optional[int] = None
+
+    # GET /payments/ and GET /periodes/ bodies; writes in the same worker invalidate at once,
+    # other workers pick them up within this many seconds
+    REFERENCE_CACHE_TTL_SECONDS: float = 60
+
+    # Bulk import (POST /imports/..., python -m app.commands.import_data)
+    IMPORT_CHUNK_SIZE: int = 1000  # rows validated / hashed / copied per round
+    IMPORT_MAX_ROWS: int = 20_000  # per request; the CLI has no limit
+    IMPORT_MAX_ERRORS: int = 200  # row errors listed in the report
+
     @field_validator("DATABASE_URL", mode="before")
     @classmethod
     def assemble_db_connection(cls, v: str) -> str:
@@ -25,6 +106,33 @@ class Settings(BaseSettings):
             return v.replace("postgresql://", "postgresql+psycopg2://", 1)
         return v
 
+    @staticmethod
+    def _asyncpg_url(url: str) -> str:
+        for prefix in ("postgresql+psycopg2://", "postgresql://"):
+            if url.startswith(prefix):
+                url = "postgresql+asyncpg://" + url[len(prefix):]
+                break
+        # asyncpg spells libpq's sslmode as ssl
+        return url.replace("sslmode=", "ssl=")
+
+    @property
+    def strict_loading(self) -> bool:
+        if self.STRICT_LOADING is not None:
+            return self.STRICT_LOADING
+        return self.ENV in ("dev", "test")
+
+    @property
+    def async_database_url(self) -> str:
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        return self._asyncpg_url(self.DATABASE_URL)
+
+    @property
+    def async_replica_url(self) -> Optional[str]:
+        if not self.DATABASE_REPLICA_URL:
+            return None
+        return self._asyncpg_url(self.DATABASE_REPLICA_URL)
+
     model_config = {
         "env_file": ".env",
         "extra": "ignore",
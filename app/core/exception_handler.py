@@ -16,6 +16,7 @@ def init_exception_handlers(app):
                 "message": str(exc.detail) if exc.detail else "An error occurred",
                 "data": None
             },
+            headers=getattr(exc, "headers", None),
         )
 
     # 🟧 Handle validation errors (body, query params, etc.)
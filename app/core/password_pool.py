@@ -0,0 +1,124 @@
+# app/core/password_pool.py
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+
+class PasswordPool:
+    """
+    Bounded process pool for CPU-heavy password hashing.
+
+    Argon2 runs in separate processes so hashing scales across cores instead of
+    occupying AnyIO threadpool slots. At most `max_pending` jobs may be queued or
+    running; extra requests are rejected with 503 instead of piling up.
+    `workers=0` hashes in one background thread instead (handy for local runs:
+    no process start-up, and the event loop still never runs argon2).
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.workers <= 0:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="password")
+                else:
+                    # spawn, not fork: the server process is multi-threaded
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+            return self._executor
+
+    def _acquire_slot(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _release_slot(self, started: float, ok: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.total_seconds += time.perf_counter() - started
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+        self._slots.release()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        self._acquire_slot()
+        started = time.perf_counter()
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release_slot(started, ok=False)
+            raise
+
+        future.add_done_callback(
+            lambda f: self._release_slot(started, ok=f.exception() is None)
+        )
+        return future
+
+    async def run_async(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def warm_up(self, fn: Callable[[], Any]) -> None:
+        """
+        Spawn every worker now and run `fn` (a no-op from the module whose
+        imports the jobs need) in each, so the first login after a cold start
+        does not wait for process start-up. Returns without waiting.
+        """
+        if self.workers <= 0:
+            return
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(fn)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_ms": round(self.total_seconds / finished * 1000, 2) if finished else 0.0,
+            }
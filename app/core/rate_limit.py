@@ -0,0 +1,92 @@
+# app/core/rate_limit.py
+import importlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+
+class RateLimitBackend(Protocol):
+    """
+    Storage for token buckets. `take` refills the bucket for `key`, tries to
+    remove one token and returns (allowed, seconds_until_next_token).
+
+    The in-memory backend is per worker; a shared backend (e.g. Redis running
+    the same arithmetic in a Lua script) can be passed to TokenBucketLimiter to
+    enforce limits across workers and instances.
+    """
+
+    def take(self, key: str, capacity: float, refill_per_second: float) -> tuple[bool, float]:
+        ...
+
+
+class InMemoryBackend:
+    def __init__(self, max_keys: int = 50_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, refill_per_second: float) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+
+            # Oldest buckets are the idle ones, which would be full again anyway
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        retry_after = 0.0 if allowed else (1 - tokens) / refill_per_second
+        return allowed, retry_after
+
+
+class TokenBucketLimiter:
+    def __init__(self, capacity: float, refill_per_second: float, backend: RateLimitBackend):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    def hit(self, key: str) -> tuple[bool, float]:
+        allowed, retry_after = self.backend.take(key, self.capacity, self.refill_per_second)
+        with self._lock:
+            if allowed:
+                self.allowed += 1
+            else:
+                self.rejected += 1
+        return allowed, retry_after
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "refill_per_second": self.refill_per_second,
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+            }
+
+
+BACKENDS = {"memory": InMemoryBackend}
+
+
+def get_backend(name: str) -> RateLimitBackend:
+    """
+    A registered backend ("memory"), or "package.module:factory" for a shared
+    store; the factory is called without arguments and returns the backend.
+    """
+    if name in BACKENDS:
+        return BACKENDS[name]()
+    module_name, _, attribute = name.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(
+            f"Unknown LOGIN_RATE_BACKEND {name!r}; expected one of {sorted(BACKENDS)} or 'package.module:factory'"
+        )
+    return getattr(importlib.import_module(module_name), attribute)()
@@ -0,0 +1,92 @@
+# app/core/reference_cache.py
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from app.core.config import settings
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    digest: str  # sha1 of body: equal across workers for equal content, unlike versions
+
+
+class ReferenceCache:
+    """
+    Versioned cache of pre-encoded JSON response bodies for small reference
+    tables (payments, periodes).
+
+    Writers call `bump(name)` after their commit, which drops the body in this
+    process at once. Other uvicorn workers never see the bump, so every entry
+    also expires after `ttl` seconds; that is the staleness bound across
+    workers (0 = reload on every request).
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._versions: dict[str, int] = {}
+        self._entries: dict[str, tuple[int, float, CachedBody]] = {}
+        self._loading: dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.bumps = 0
+
+    def version(self, name: str) -> int:
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def bump(self, name: str) -> None:
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            self._entries.pop(name, None)
+            self.bumps += 1
+
+    def _current(self, name: str) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            version, expires_at, cached = entry
+            if version != self._versions.get(name, 0) or expires_at <= time.monotonic():
+                return None
+            self.hits += 1
+            return cached
+
+    async def get(self, name: str, load: Callable[[], Awaitable[bytes]]) -> CachedBody:
+        """The cached body for `name`, or `await load()` once per miss (concurrent misses wait for it)."""
+        cached = self._current(name)
+        if cached is not None:
+            return cached
+
+        async with self._loading.setdefault(name, asyncio.Lock()):
+            cached = self._current(name)
+            if cached is not None:
+                return cached
+            version = self.version(name)
+            body = await load()
+            cached = CachedBody(body, hashlib.sha1(body).hexdigest())
+            with self._lock:
+                self.misses += 1
+                # A bump during the load means `body` may predate the write: serve it, don't keep it
+                if self._versions.get(name, 0) == version:
+                    self._entries[name] = (version, time.monotonic() + self.ttl, cached)
+            return cached
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "ttl_seconds": self.ttl,
+                "entries": sorted(self._entries),
+                "versions": dict(self._versions),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "bumps": self.bumps,
+            }
+
+
+reference_cache = ReferenceCache(ttl=settings.REFERENCE_CACHE_TTL_SECONDS)
@@ -0,0 +1,160 @@
+# app/core/revocation.py
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.bloom import BloomFilter
+from app.db.models.revoked_token import RevokedToken
+
+# Re-read rows slightly older than the watermark so rows from transactions that
+# committed out of order are not missed
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class RevocationStore:
+    """
+    Refresh-token revocations persisted in Postgres (`revoked_tokens`) and
+    shared by every worker. Rows are purged once the token has expired anyway.
+
+    Each worker keeps a Bloom filter of revoked jtis, refreshed incrementally
+    every `sync_interval` seconds, so a lookup only hits the DB when the filter
+    says the jti may be revoked. A revocation made by another worker is seen
+    here after at most `sync_interval` seconds.
+
+    Lookups that find a sync due wait for it (one sync runs at a time), and a
+    failed sync raises instead of leaving a stale or empty filter trusted.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, sync_interval: float, purge_interval: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.purge_interval = purge_interval
+
+        self._lock = threading.Lock()
+        self._sync_lock = asyncio.Lock()
+        self._filter = BloomFilter(capacity, error_rate)
+        self._watermark: Optional[datetime] = None
+        self._loaded = False
+        self._last_sync = 0.0
+        self._last_purge = 0.0
+        # jtis revoked here while a rebuild is reading the table
+        self._rebuild_adds: Optional[list[str]] = None
+
+        self.filter_negatives = 0
+        self.db_checks = 0
+        self.revoked_hits = 0
+        self.false_positives = 0
+        self.syncs = 0
+        self.rebuilds = 0
+        self.purged = 0
+
+    async def revoke(self, db: AsyncSession, jti: str, expires_at: datetime) -> None:
+        await db.execute(
+            insert(RevokedToken)
+            .values(jti=jti, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        )
+        await db.commit()
+        with self._lock:
+            self._filter.add(jti)
+            if self._rebuild_adds is not None:
+                self._rebuild_adds.append(jti)
+
+    async def is_revoked(self, db: AsyncSession, jti: str) -> bool:
+        await self._sync(db)
+
+        with self._lock:
+            # Until a sync has loaded the filter, a miss proves nothing
+            if self._loaded and jti not in self._filter:
+                self.filter_negatives += 1
+                return False
+            self.db_checks += 1
+
+        result = await db.execute(
+            select(RevokedToken.jti).where(
+                RevokedToken.jti == jti,
+                RevokedToken.expires_at > datetime.now(timezone.utc),
+            )
+        )
+        revoked = result.first() is not None
+
+        with self._lock:
+            if revoked:
+                self.revoked_hits += 1
+            else:
+                self.false_positives += 1
+        return revoked
+
+    async def _sync(self, db: AsyncSession) -> None:
+        if time.monotonic() - self._last_sync < self.sync_interval:
+            return
+        async with self._sync_lock:
+            # Callers that queued behind a sync find it done
+            if time.monotonic() - self._last_sync < self.sync_interval:
+                return
+            await self._load(db)
+            # Only after the filter is loaded; a failure leaves the sync due
+            self._last_sync = time.monotonic()
+
+    async def _load(self, db: AsyncSession) -> None:
+        now = time.monotonic()
+        purge_due = now - self._last_purge >= self.purge_interval
+        watermark = None if purge_due or not self._loaded else self._watermark
+
+        if purge_due:
+            result = await db.execute(
+                delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc))
+            )
+            await db.commit()
+            self._last_purge = now
+            with self._lock:
+                self.purged += result.rowcount or 0
+
+        query = select(RevokedToken.jti, RevokedToken.revoked_at)
+        if watermark is not None:
+            query = query.where(RevokedToken.revoked_at > watermark - SYNC_OVERLAP)
+        else:
+            with self._lock:
+                self._rebuild_adds = []
+        try:
+            rows = (await db.execute(query)).all()
+        except BaseException:
+            with self._lock:
+                self._rebuild_adds = None
+            raise
+
+        with self._lock:
+            if watermark is None:
+                # Full rebuild after a purge keeps the filter from saturating
+                bloom = BloomFilter(self.capacity, self.error_rate)
+                for jti in self._rebuild_adds:
+                    bloom.add(jti)
+                self._filter = bloom
+                self._rebuild_adds = None
+                self.rebuilds += 1
+            for jti, revoked_at in rows:
+                self._filter.add(jti)
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+            self._loaded = True
+            self.syncs += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "filter": self._filter.stats(),
+                "filter_negatives": self.filter_negatives,
+                "db_checks": self.db_checks,
+                "revoked_hits": self.revoked_hits,
+                "false_positives": self.false_positives,
+                "syncs": self.syncs,
+                "rebuilds": self.rebuilds,
+                "purged": self.purged,
+            }
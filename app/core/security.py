@@ -1,15 +1,28 @@
 # app/core/security.py
 
+import asyncio
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
-from jose import jwt
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.password_pool import PasswordPool
+from app.core.tokens import HMAC_ALGORITHMS, TokenExpiredError, TokenSigner, get_backend
+
+_argon2_costs = {
+    "argon2__time_cost": settings.ARGON2_TIME_COST,
+    "argon2__memory_cost": settings.ARGON2_MEMORY_COST,
+    "argon2__parallelism": settings.ARGON2_PARALLELISM,
+}
 
 pwd_context = CryptContext(
     schemes=["argon2"],
     default="argon2",
-    deprecated="auto"
+    deprecated="auto",
+    **{key: value for key, value in _argon2_costs.items() if value is not None},
 )
 
 SECRET_KEY = settings.SECRET_KEY
@@ -18,42 +31,155 @@ ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
+token_backend = get_backend(settings.JWT_BACKEND)
+
+# Access tokens: HMAC with SECRET_KEY, or asymmetric with JWT_PRIVATE_KEY
+access_signer = TokenSigner(
+    backend=token_backend,
+    algorithm=ALGORITHM,
+    signing_key=SECRET_KEY if ALGORITHM in HMAC_ALGORITHMS else settings.JWT_PRIVATE_KEY,
+    key_id=settings.JWT_KEY_ID,
+    verification_keys=settings.JWT_VERIFICATION_KEYS,
+)
+
+# Refresh tokens are only ever verified here, so they always use an HMAC secret
+refresh_signer = TokenSigner(
+    backend=token_backend,
+    algorithm=ALGORITHM if ALGORITHM in HMAC_ALGORITHMS else "HS256",
+    signing_key=REFRESH_SECRET_KEY,
+    key_id=settings.JWT_REFRESH_KEY_ID,
+    verification_keys=settings.JWT_REFRESH_VERIFICATION_KEYS,
+)
+
+# sha256(token) -> verified claims; per-entry TTL is the token's remaining lifetime
+access_token_cache = TTLCache(
+    max_size=settings.ACCESS_TOKEN_CACHE_MAX_SIZE,
+    ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_POOL_WORKERS,
+    max_pending=settings.PASSWORD_POOL_MAX_PENDING,
+)
+
 
 # ------------------------------------
 # PASSWORD HASHING
 # ------------------------------------
-def hash_password(password: str) -> str:
+# These run inside the pool's worker processes
+def _hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _hash_passwords(passwords: list[str]) -> list[str]:
+    return [pwd_context.hash(password) for password in passwords]
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _warm_up_worker() -> None:
+    # Unpickling this imports app.core.security (settings, passlib) in the worker
+    return None
+
+
+def warm_up_password_pool() -> None:
+    """Start the hashing workers at app start-up instead of on the first login."""
+    password_pool.warm_up(_warm_up_worker)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    # Cheap: only parses the hash header against the configured argon2 costs
+    return pwd_context.needs_update(hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run_async(_hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run_async(_verify_password, plain_password, hashed_password)
+
+
+# Passwords per pool job in hash_passwords_async: few enough that a login
+# queued behind an import job waits for a handful of hashes, not the batch
+HASH_BATCH_SIZE = 8
+
+
+async def hash_passwords_async(passwords: list[str], pool: PasswordPool = None) -> list[str]:
+    """
+    Hash a batch (bulk imports) across the pool's workers, keeping at most one
+    job per worker in flight so interactive logins still get pool slots.
+    """
+    pool = pool or password_pool
+    in_flight = asyncio.Semaphore(max(pool.workers, 1))
+
+    async def hash_slice(start: int) -> list[str]:
+        async with in_flight:
+            return await pool.run_async(_hash_passwords, passwords[start:start + HASH_BATCH_SIZE])
+
+    slices = await asyncio.gather(*(hash_slice(start) for start in range(0, len(passwords), HASH_BATCH_SIZE)))
+    return [hashed for hashed_slice in slices for hashed in hashed_slice]
+
+
 # ------------------------------------
 # TOKEN CREATION
 # ------------------------------------
+def access_token_claims(user) -> dict:
+    # uid ties the token to one account; the role is read from the principal cache, never the token
+    return {"sub": user.email, "uid": user.id}
+
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
 
-    encoded_jwt = jwt.encode(
-        to_encode,
-        SECRET_KEY,
-        algorithm=ALGORITHM,
-    )
-    return encoded_jwt
+    return access_signer.encode(to_encode)
 
 
 def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+
+    return refresh_signer.encode(to_encode)
+
+
+# ------------------------------------
+# TOKEN VERIFICATION
+# ------------------------------------
+def decode_access_token(token: str) -> dict:
+    """
+    Verify an access token, reusing previously verified claims when the same
+    token comes back. Raises TokenError / TokenExpiredError.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    claims = access_token_cache.get(key)
+    now = time.time()
+
+    if claims is not None:
+        exp = claims.get("exp")
+        if exp is not None and exp <= now:
+            access_token_cache.invalidate(key)
+            raise TokenExpiredError("Signature has expired.")
+        return claims
+
+    claims = access_signer.decode(token)
+    exp = claims.get("exp")
+    if exp is None:
+        access_token_cache.set(key, claims)
+    elif exp > now:
+        access_token_cache.set(key, claims, ttl=exp - now)
+    return claims
+
+
+def decode_refresh_token(token: str) -> dict:
+    return refresh_signer.decode(token)
+
 
-    encoded_jwt = jwt.encode(
-        to_encode,
-        REFRESH_SECRET_KEY,
-        algorithm=ALGORITHM,
-    )
-    return encoded_jwt
+def refresh_token_id(token: str, payload: dict) -> str:
+    # Tokens issued before jti was added are identified by their digest
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
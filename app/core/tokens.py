@@ -0,0 +1,156 @@
+# app/core/tokens.py
+from typing import ClassVar, Optional, Protocol
+
+HMAC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+
+
+class TokenError(Exception):
+    """Token is malformed, has a bad signature or an unknown key id."""
+
+
+class TokenExpiredError(TokenError):
+    pass
+
+
+# ------------------------------------
+# BACKENDS
+# ------------------------------------
+class TokenBackend(Protocol):
+    """
+    A JWT library. `decode` verifies the signature and expiry and raises
+    TokenExpiredError / TokenError; `unverified_header` reads the header
+    (for `kid`) without verifying anything. `algorithms` lists what the
+    library can sign and verify.
+    """
+
+    name: ClassVar[str]
+    algorithms: ClassVar[set[str]]
+
+    def encode(self, claims: dict, key: str, algorithm: str, headers: dict) -> str:
+        ...
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict:
+        ...
+
+    def unverified_header(self, token: str) -> dict:
+        ...
+
+
+class JoseBackend:
+    name = "jose"
+    algorithms = HMAC_ALGORITHMS | {"ES256", "ES384", "RS256"}
+
+    def __init__(self):
+        from jose import jwt
+        from jose.exceptions import ExpiredSignatureError, JWTError
+
+        self._jwt = jwt
+        self._expired = ExpiredSignatureError
+        self._error = JWTError
+
+    def encode(self, claims, key, algorithm, headers):
+        return self._jwt.encode(claims, key, algorithm=algorithm, headers=headers)
+
+    def decode(self, token, key, algorithm):
+        try:
+            return self._jwt.decode(token, key, algorithms=[algorithm])
+        except self._expired as exc:
+            raise TokenExpiredError(str(exc)) from exc
+        except self._error as exc:
+            raise TokenError(str(exc)) from exc
+
+    def unverified_header(self, token):
+        try:
+            return self._jwt.get_unverified_header(token)
+        except self._error as exc:
+            raise TokenError(str(exc)) from exc
+
+
+class PyJWTBackend:
+    name = "pyjwt"
+    algorithms = HMAC_ALGORITHMS | {"ES256", "ES384", "RS256", "EdDSA"}
+
+    def __init__(self):
+        try:
+            import jwt
+        except ImportError as exc:  # pragma: no cover - depends on the environment
+            raise RuntimeError("JWT_BACKEND=pyjwt requires the PyJWT package") from exc
+        self._jwt = jwt
+
+    def encode(self, claims, key, algorithm, headers):
+        return self._jwt.encode(claims, key, algorithm=algorithm, headers=headers)
+
+    def decode(self, token, key, algorithm):
+        try:
+            return self._jwt.decode(token, key, algorithms=[algorithm])
+        except self._jwt.ExpiredSignatureError as exc:
+            raise TokenExpiredError(str(exc)) from exc
+        except self._jwt.PyJWTError as exc:
+            raise TokenError(str(exc)) from exc
+
+    def unverified_header(self, token):
+        try:
+            return self._jwt.get_unverified_header(token)
+        except self._jwt.PyJWTError as exc:
+            raise TokenError(str(exc)) from exc
+
+
+BACKENDS = {backend.name: backend for backend in (JoseBackend, PyJWTBackend)}
+
+
+def get_backend(name: str) -> TokenBackend:
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown JWT_BACKEND {name!r}; expected one of {sorted(BACKENDS)}")
+
+
+# ------------------------------------
+# KEYS
+# ------------------------------------
+def public_key_pem(private_key_pem: str) -> str:
+    from cryptography.hazmat.primitives import serialization
+
+    private_key = serialization.load_pem_private_key(private_key_pem.encode(), password=None)
+    return private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+
+
+class TokenSigner:
+    """
+    Signs with the current key and stamps its `kid` into the header; verifies
+    with whichever key the token's `kid` names. Keeping the previous key in
+    `verification_keys` while clients pick up new tokens gives zero-downtime
+    rotation. Tokens without a `kid` are checked against the current key.
+    """
+
+    def __init__(
+        self,
+        backend: TokenBackend,
+        algorithm: str,
+        signing_key: str,
+        key_id: str,
+        verification_keys: Optional[dict[str, str]] = None,
+    ):
+        if algorithm not in backend.algorithms:
+            raise ValueError(f"JWT backend {backend.name!r} does not support {algorithm}")
+
+        self.backend = backend
+        self.algorithm = algorithm
+        self.key_id = key_id
+        self._signing_key = signing_key
+
+        current = signing_key if algorithm in HMAC_ALGORITHMS else public_key_pem(signing_key)
+        self._verification_keys = {**(verification_keys or {}), key_id: current}
+
+    def encode(self, claims: dict) -> str:
+        return self.backend.encode(claims, self._signing_key, self.algorithm, {"kid": self.key_id})
+
+    def decode(self, token: str) -> dict:
+        key_id = self.backend.unverified_header(token).get("kid", self.key_id)
+        key = self._verification_keys.get(key_id)
+        if key is None:
+            raise TokenError(f"Unknown signing key {key_id!r}")
+        return self.backend.decode(token, key, self.algorithm)
@@ -0,0 +1,413 @@
+# app/db/imports.py
+"""
+Bulk member / transaction import shared by POST /imports/{kind} and
+`python -m app.commands.import_data`.
+
+Records are read from CSV or a JSON array, validated in chunks of
+IMPORT_CHUNK_SIZE (passwords hashed across the password pool), copied into a
+temporary staging table (asyncpg COPY on PostgreSQL, executemany elsewhere)
+and merged into the real table with one INSERT ... SELECT that skips rows
+failing a database check. Every rejected row is reported with its record
+number; the whole import commits once, or not at all with `dry_run`.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import islice
+from typing import Awaitable, BinaryIO, Callable, Iterator, Optional
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, Numeric, String, Table, Text,
+    and_, case, cast, delete, exists, func, insert, literal, select, true, union_all, update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.password_pool import PasswordPool
+from app.core.security import hash_passwords_async
+from app.db.models.payment import Payment
+from app.db.models.periode import Periode
+from app.db.models.transaction import Transaction, TransactionStatus
+from app.db.models.user import User
+from app.db.summaries import apply_contribution_deltas
+from app.schemas.imports import ImportReport, ImportRowError, TransactionImportRow, UserImportRow
+
+# Per-connection scratch tables; created and dropped by each import
+_staging = MetaData()
+
+STAGING_USERS = Table(
+    "import_users",
+    _staging,
+    Column("row_no", Integer, nullable=False),
+    Column("fullname", String(100)),
+    Column("username", String(50)),
+    Column("email", String(100)),
+    Column("password", String(255)),
+    Column("phone_number", String(20)),
+    Column("domisili", String(100)),
+    Column("user_type", String(20)),
+    prefixes=["TEMPORARY"],
+)
+
+STAGING_TRANSACTIONS = Table(
+    "import_transactions",
+    _staging,
+    Column("row_no", Integer, nullable=False),
+    Column("user_id", Integer),
+    Column("username", String(50)),
+    Column("amount", Numeric(12, 2)),
+    Column("transaction_date", DateTime(timezone=True)),
+    Column("status", String(20)),
+    Column("periode_id", Integer),
+    Column("payment_id", Integer),
+    Column("bukti_transfer_url", Text),
+    prefixes=["TEMPORARY"],
+)
+
+
+# ----------------------------------------------------------
+# Reading
+# ----------------------------------------------------------
+def read_records(stream: BinaryIO, filename: str, row_model: type[BaseModel]) -> Iterator[dict]:
+    """
+    Records from a `.json` array of objects, or from CSV (anything else).
+    CSV is streamed; empty cells count as missing so model defaults apply.
+    Reads from a blocking stream: call it in the threadpool from async code.
+    """
+    if filename.lower().endswith(".json"):
+        try:
+            records = json.load(stream)
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {exc}")
+        if not isinstance(records, list):
+            raise HTTPException(status_code=400, detail="JSON import must be an array of objects")
+        return iter(records)
+
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    header = [name.strip() for name in reader.fieldnames or ()]
+    unknown = set(header) - set(row_model.model_fields)
+    if not header or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown CSV columns: {', '.join(sorted(unknown)) or '(no header)'}. "
+            f"Allowed: {', '.join(row_model.model_fields)}",
+        )
+    reader.fieldnames = header
+    return (
+        {name: value.strip() for name, value in record.items() if name and value and value.strip()}
+        for record in reader
+    )
+
+
+# ----------------------------------------------------------
+# Chunk preparation: model rows -> staging rows
+# ----------------------------------------------------------
+async def _prepare_users(rows: list[tuple[int, UserImportRow]], report: "_Report", pool: Optional[PasswordPool]) -> list[dict]:
+    accepted = []
+    for row_no, row in rows:
+        email, username = row.email.lower(), row.username.lower()
+        if email in report.seen_emails:
+            report.error(row_no, "email", "Duplicate email in this file")
+        elif username in report.seen_usernames:
+            report.error(row_no, "username", "Duplicate username in this file")
+        else:
+            report.seen_emails.add(email)
+            report.seen_usernames.add(username)
+            accepted.append((row_no, row))
+
+    hashes = await hash_passwords_async([row.password for _, row in accepted], pool=pool)
+    return [
+        {
+            "row_no": row_no,
+            "fullname": row.fullname,
+            "username": row.username,
+            "email": row.email,
+            "password": hashed,
+            "phone_number": row.phone_number,
+            "domisili": row.domisili,
+            "user_type": row.user_type,
+        }
+        for (row_no, row), hashed in zip(accepted, hashes)
+    ]
+
+
+async def _prepare_transactions(rows: list[tuple[int, TransactionImportRow]], report: "_Report", pool) -> list[dict]:
+    return [
+        {
+            "row_no": row_no,
+            "user_id": row.user_id,
+            "username": row.username,
+            "amount": row.amount,
+            "transaction_date": row.transaction_date,
+            "status": row.status.value,
+            "periode_id": row.periode_id,
+            "payment_id": row.payment_id,
+            "bukti_transfer_url": row.bukti_transfer_url,
+        }
+        for row_no, row in rows
+    ]
+
+
+# ----------------------------------------------------------
+# Merge: staging -> real table, one INSERT ... SELECT
+# ----------------------------------------------------------
+def _user_checks():
+    s = STAGING_USERS
+    return [
+        ("email", "Email already registered", exists().where(func.lower(User.email) == func.lower(s.c.email))),
+        ("username", "Username already taken", exists().where(func.lower(User.username) == func.lower(s.c.username))),
+    ]
+
+
+async def _merge_users(db: AsyncSession, reported_by_id: Optional[int]) -> int:
+    s = STAGING_USERS
+    rejected = [bad for _, _, bad in _user_checks()]
+    result = await db.execute(
+        insert(User)
+        .from_select(
+            ["fullname", "username", "email", "password", "phone_number", "domisili", "user_type", "is_active"],
+            select(
+                s.c.fullname,
+                s.c.username,
+                s.c.email,
+                s.c.password,
+                s.c.phone_number,
+                s.c.domisili,
+                cast(s.c.user_type, User.user_type.type),
+                true(),
+            ).where(and_(*(~bad for bad in rejected))),
+        )
+        .returning(User.id)
+    )
+    return len(result.all())
+
+
+def _transaction_checks():
+    s = STAGING_TRANSACTIONS
+    earlier = s.alias("earlier")
+    return [
+        ("user_id", "Unknown member (user_id / username)", ~exists().where(User.id == s.c.user_id)),
+        ("periode_id", "Unknown periode", and_(s.c.periode_id.is_not(None), ~exists().where(Periode.id == s.c.periode_id))),
+        ("payment_id", "Unknown payment", and_(s.c.payment_id.is_not(None), ~exists().where(Payment.id == s.c.payment_id))),
+        (
+            None,
+            "Duplicate of an earlier row in this file (same member, transaction_date and amount)",
+            exists().where(
+                earlier.c.row_no < s.c.row_no,
+                earlier.c.user_id == s.c.user_id,
+                earlier.c.transaction_date == s.c.transaction_date,
+                earlier.c.amount == s.c.amount,
+            ),
+        ),
+        (
+            None,
+            "Already imported (same member, transaction_date and amount)",
+            exists().where(
+                Transaction.user_id == s.c.user_id,
+                Transaction.transaction_date == s.c.transaction_date,
+                Transaction.amount == s.c.amount,
+            ),
+        ),
+    ]
+
+
+async def _resolve_transaction_members(db: AsyncSession) -> None:
+    # username -> user_id, so every check and the merge work on ids
+    s = STAGING_TRANSACTIONS
+    await db.execute(
+        update(s)
+        .where(s.c.user_id.is_(None))
+        .values(
+            user_id=select(User.id)
+            .where(func.lower(User.username) == func.lower(s.c.username))
+            .scalar_subquery()
+        )
+    )
+
+
+async def _merge_transactions(db: AsyncSession, reported_by_id: Optional[int]) -> int:
+    s = STAGING_TRANSACTIONS
+    status = cast(s.c.status, Transaction.status.type)
+    rejected = [bad for _, _, bad in _transaction_checks()]
+    result = await db.execute(
+        insert(Transaction)
+        .from_select(
+            [
+                "amount", "transaction_date", "status", "bukti_transfer_url", "user_id",
+                "reported_by_id", "confirmed_by_id", "periode_id", "payment_id",
+            ],
+            select(
+                s.c.amount,
+                s.c.transaction_date,
+                status,
+                s.c.bukti_transfer_url,
+                s.c.user_id,
+                literal(reported_by_id, Integer),
+                # Back-filled completed transfers count as confirmed by the importer
+                case((s.c.status == TransactionStatus.completed.value, literal(reported_by_id, Integer))),
+                s.c.periode_id,
+                s.c.payment_id,
+            ).where(and_(*(~bad for bad in rejected))),
+        )
+        .returning(Transaction.user_id, Transaction.periode_id, Transaction.status, Transaction.amount)
+    )
+    rows = result.all()
+
+    deltas: dict = {}
+    for row in rows:
+        count, amount = deltas.get((row.user_id, row.periode_id, row.status), (0, Decimal(0)))
+        deltas[(row.user_id, row.periode_id, row.status)] = (count + 1, amount + row.amount)
+    await apply_contribution_deltas(db, deltas)
+    return len(rows)
+
+
+@dataclass(frozen=True)
+class Importer:
+    row_model: type[BaseModel]
+    staging: Table
+    prepare: Callable[..., Awaitable[list[dict]]]
+    checks: Callable[[], list]
+    merge: Callable[[AsyncSession, Optional[int]], Awaitable[int]]
+    resolve: Optional[Callable[[AsyncSession], Awaitable[None]]] = None
+    needs_reporter: bool = False
+
+
+IMPORTERS = {
+    "users": Importer(UserImportRow, STAGING_USERS, _prepare_users, _user_checks, _merge_users),
+    "transactions": Importer(
+        TransactionImportRow,
+        STAGING_TRANSACTIONS,
+        _prepare_transactions,
+        _transaction_checks,
+        _merge_transactions,
+        resolve=_resolve_transaction_members,
+        needs_reporter=True,
+    ),
+}
+
+
+# ----------------------------------------------------------
+# Driver
+# ----------------------------------------------------------
+class _Report:
+    def __init__(self, kind: str, dry_run: bool, max_errors: int):
+        self.report = ImportReport(kind=kind, dry_run=dry_run)
+        self.max_errors = max_errors
+        self.failed_rows: set[int] = set()
+        self.seen_emails: set[str] = set()
+        self.seen_usernames: set[str] = set()
+
+    def error(self, row_no: int, field: Optional[str], message: str) -> None:
+        self.failed_rows.add(row_no)
+        if len(self.report.errors) < self.max_errors:
+            self.report.errors.append(ImportRowError(row=row_no, field=field, message=message))
+        else:
+            self.report.errors_truncated = True
+
+
+def _validate_chunk(numbered: Iterator[tuple[int, object]], row_model: type[BaseModel], state: _Report) -> tuple[int, list]:
+    """
+    Read and validate the next IMPORT_CHUNK_SIZE records: (records read,
+    [(row_no, model row)]). CSV parsing and pydantic validation are CPU
+    work on a blocking stream, so run_import calls this in the threadpool.
+    """
+    chunk = list(islice(numbered, settings.IMPORT_CHUNK_SIZE))
+    valid = []
+    for row_no, record in chunk:
+        try:
+            if not isinstance(record, dict):
+                raise TypeError("Record must be an object")
+            valid.append((row_no, row_model.model_validate(record)))
+        except ValidationError as exc:
+            for error in exc.errors():
+                state.error(row_no, ".".join(map(str, error["loc"])) or None, error["msg"])
+        except TypeError as exc:
+            state.error(row_no, None, str(exc))
+    return len(chunk), valid
+
+
+async def _copy_into(db: AsyncSession, table: Table, rows: list[dict]) -> None:
+    if not rows:
+        return
+    if db.bind.dialect.name == "postgresql":
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        columns = [column.name for column in table.columns]
+        await raw.driver_connection.copy_records_to_table(
+            table.name,
+            records=[tuple(row[name] for name in columns) for row in rows],
+            columns=columns,
+        )
+    else:
+        await db.execute(insert(table), rows)
+
+
+async def run_import(
+    db: AsyncSession,
+    kind: str,
+    records: Iterator[dict],
+    reported_by_id: Optional[int] = None,
+    dry_run: bool = False,
+    max_rows: Optional[int] = None,
+    pool: Optional[PasswordPool] = None,
+) -> ImportReport:
+    importer = IMPORTERS[kind]
+    if importer.needs_reporter and reported_by_id is None:
+        raise ValueError(f"{kind} imports need reported_by_id")
+
+    state = _Report(kind, dry_run, settings.IMPORT_MAX_ERRORS)
+    report = state.report
+    staging = importer.staging
+
+    try:
+        await db.run_sync(lambda session: staging.create(session.connection(), checkfirst=True))
+        # Leftovers from an aborted import on this connection (no transactional DDL)
+        await db.execute(delete(staging))
+
+        numbered = enumerate(records, start=1)
+        while True:
+            read, valid = await run_in_threadpool(_validate_chunk, numbered, importer.row_model, state)
+            if not read:
+                break
+            report.rows += read
+            if max_rows is not None and report.rows > max_rows:
+                raise HTTPException(status_code=413, detail=f"Import is limited to {max_rows} rows per request")
+
+            await _copy_into(db, staging, await importer.prepare(valid, state, pool))
+
+        if importer.resolve is not None:
+            await importer.resolve(db)
+
+        # Row-level report for everything the merge will skip, then the merge itself
+        checks = importer.checks()
+        rejected = await db.execute(
+            union_all(
+                *(
+                    select(staging.c.row_no, literal(field, String).label("field"), literal(message, String).label("message"))
+                    .where(bad)
+                    for field, message, bad in checks
+                )
+            ).order_by("row_no")
+        )
+        for row in rejected:
+            state.error(row.row_no, row.field, row.message)
+
+        report.imported = await importer.merge(db, reported_by_id)
+        report.failed = len(state.failed_rows)
+        report.errors.sort(key=lambda error: error.row)
+
+        await db.run_sync(lambda session: staging.drop(session.connection()))
+        if dry_run:
+            await db.rollback()
+        else:
+            await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+
+    return report
@@ -0,0 +1,160 @@
+# app/db/instrumentation.py
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.sql")
+
+# Fingerprints kept per request for the slow-request log
+MAX_FINGERPRINTS = 50
+
+
+@dataclass
+class RequestSQLStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+    fingerprints: list = field(default_factory=list)
+
+
+_request_stats: ContextVar[Optional[RequestSQLStats]] = ContextVar("request_sql_stats", default=None)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\((?:\s*(?:\?|\$\d+|%\(\w+\)s|:\w+)\s*,?)+\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement with literals and IN-lists collapsed, so repeats group together."""
+    statement = _LITERALS.sub("?", statement)
+    statement = _PLACEHOLDER_LISTS.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    started = conn.info.get("query_started")
+    if stats is None or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats.statements += 1
+    stats.db_seconds += elapsed
+    if len(stats.fingerprints) < MAX_FINGERPRINTS:
+        stats.fingerprints.append((elapsed, statement))
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count statements and DB time for the current request (async engines: pass .sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class RouteSQLStats:
+    """Per route template totals, e.g. `GET /transactions/`."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict[str, list] = {}
+
+    def record(self, route: str, stats: RequestSQLStats, total_seconds: float) -> None:
+        with self._lock:
+            entry = self._routes.setdefault(route, [0, 0, 0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += stats.statements
+            entry[2] = max(entry[2], stats.statements)
+            entry[3] += stats.db_seconds
+            entry[4] += total_seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            routes = {route: list(entry) for route, entry in self._routes.items()}
+        return {
+            route: {
+                "requests": requests,
+                "avg_statements": round(statements / requests, 2),
+                "max_statements": max_statements,
+                "avg_db_ms": round(db_seconds / requests * 1000, 3),
+                "avg_total_ms": round(total_seconds / requests * 1000, 3),
+            }
+            for route, (requests, statements, max_statements, db_seconds, total_seconds) in sorted(
+                routes.items(), key=lambda item: -item[1][3]
+            )
+        }
+
+
+route_sql_stats = RouteSQLStats()
+
+
+class SQLTimingMiddleware:
+    """
+    Pure ASGI middleware: collects the request's SQL stats, adds a
+    `Server-Timing: db;dur=..;desc="N queries", app;dur=..` header, records
+    per-route totals and logs the statement fingerprints of requests slower
+    than `slow_ms` (0 = never).
+    """
+
+    def __init__(self, app, slow_ms: float = 0):
+        self.app = app
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSQLStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                header = (
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries", '
+                    f"app;dur={elapsed_ms:.1f}"
+                )
+                message.setdefault("headers", []).append((b"server-timing", header.encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            total_seconds = time.perf_counter() - started
+            route = scope.get("route")
+            template = f"{scope['method']} {getattr(route, 'path', None) or 'unmatched'}"
+            route_sql_stats.record(template, stats, total_seconds)
+
+            if self.slow_ms and total_seconds * 1000 >= self.slow_ms:
+                self._log_slow(template, stats, total_seconds)
+
+    @staticmethod
+    def _log_slow(template: str, stats: RequestSQLStats, total_seconds: float) -> None:
+        grouped: dict[str, list] = {}
+        for elapsed, statement in stats.fingerprints:
+            entry = grouped.setdefault(fingerprint(statement), [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+        lines = [
+            f"  {count}x {elapsed * 1000:.1f} ms  {statement}"
+            for statement, (count, elapsed) in sorted(grouped.items(), key=lambda item: -item[1][1])
+        ]
+        logger.warning(
+            "slow request %s: %.1f ms total, %d queries, %.1f ms in db\n%s",
+            template,
+            total_seconds * 1000,
+            stats.statements,
+            stats.db_seconds * 1000,
+            "\n".join(lines),
+        )
@@ -0,0 +1,60 @@
+# app/db/loaders.py
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+from app.core.config import settings
+from app.db.models.transaction import Transaction
+from app.db.models.user import User
+from app.utils.fieldsets import load_only_columns
+
+# Columns serialized by SimpleUser
+SIMPLE_USER_COLUMNS = (User.id, User.fullname, User.email, User.user_type)
+
+# Relations serialized by TransactionOut, with the foreign key each loader needs
+TRANSACTION_USER_RELATIONS = {
+    "user": (Transaction.user, Transaction.user_id),
+    "reported_by": (Transaction.reported_by, Transaction.reported_by_id),
+    "confirmed_by": (Transaction.confirmed_by, Transaction.confirmed_by_id),
+}
+TRANSACTION_JOINED_RELATIONS = {
+    "payment": Transaction.payment,
+    "periode": Transaction.periode,
+}
+
+
+@lru_cache(maxsize=64)
+def transaction_out_options(
+    fields: Optional[frozenset] = None,
+    strict: bool = settings.strict_loading,
+) -> tuple:
+    """
+    Loader options for every read serialized as TransactionOut, or as the
+    subset of it named by `fields` (see app.utils.fieldsets).
+
+    The three user relations are fetched with selectinload (one narrow
+    `IN (...)` query each, instead of three more users joined into every row);
+    payment and periode are small many-to-ones and stay joined. With `fields`,
+    only the named columns (plus id / created_at for the cursor) are selected
+    and relations not asked for are not loaded at all. With `strict`, anything
+    else raises instead of lazy-loading.
+    """
+    wanted = fields if fields is not None else set(TRANSACTION_USER_RELATIONS) | set(TRANSACTION_JOINED_RELATIONS)
+
+    options = tuple(
+        selectinload(relation).load_only(*SIMPLE_USER_COLUMNS, raiseload=strict)
+        for name, (relation, _) in TRANSACTION_USER_RELATIONS.items()
+        if name in wanted
+    )
+    options += tuple(joinedload(relation) for name, relation in TRANSACTION_JOINED_RELATIONS.items() if name in wanted)
+
+    if fields is not None:
+        foreign_keys = [fk for name, (_, fk) in TRANSACTION_USER_RELATIONS.items() if name in fields]
+        options += (load_only_columns(Transaction, fields, [Transaction.id, Transaction.created_at, *foreign_keys]),)
+        # Unrequested relations: not even the model's default lazy="joined"
+        options += (raiseload("*"),)
+    elif strict:
+        options += (raiseload("*"),)
+    return options
+
@@ -2,3 +2,5 @@ from app.db.models.user import User
 from app.db.models.periode import Periode
 from app.db.models.payment import Payment
 from app.db.models.transaction import Transaction
+from app.db.models.revoked_token import RevokedToken
+from app.db.models.contribution_summary import ContributionSummary
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, Numeric, Enum, ForeignKey, TIMESTAMP, Index, func, literal_column
+from app.db.base import Base
+from app.db.models.transaction import TransactionStatus
+
+
+class ContributionSummary(Base):
+    """
+    Running count / amount of transactions per (user_id, periode_id, status),
+    kept in step with `transactions` by app.db.summaries.apply_contribution_delta
+    in the same DB transaction as each write. Rebuild with
+    `python -m app.commands.rebuild_contribution_summaries`.
+    """
+
+    __tablename__ = "contribution_summaries"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    periode_id = Column(Integer, ForeignKey("periodes.id", ondelete="CASCADE"), nullable=True)
+    status = Column(Enum(TransactionStatus), nullable=False)
+    count = Column(Integer, nullable=False, server_default="0")
+    total_amount = Column(Numeric(14, 2), nullable=False, server_default="0")
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# One row per key; transactions without a periode share the 0 slot (NULLs would never conflict).
+# A literal, not a bound parameter: ON CONFLICT must repeat the index expression verbatim.
+CONTRIBUTION_SUMMARY_KEY = (
+    ContributionSummary.user_id,
+    func.coalesce(ContributionSummary.periode_id, literal_column("0")),
+    ContributionSummary.status,
+)
+Index("ux_contribution_summaries_key", *CONTRIBUTION_SUMMARY_KEY, unique=True)
+Index("ix_contribution_summaries_periode", ContributionSummary.periode_id)
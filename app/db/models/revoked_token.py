@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, TIMESTAMP, func
+from app.db.base import Base
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
+    revoked_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, index=True)
@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, Integer, Numeric, Enum, ForeignKey, Text,
-    TIMESTAMP, DateTime, func
+    TIMESTAMP, DateTime, Index, func
 )
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -39,3 +39,15 @@ class Transaction(Base):
     confirmed_by = relationship("User", foreign_keys=[confirmed_by_id])
     payment = relationship("Payment", lazy="joined")   # ✅ this one must exist
     periode = relationship("Periode", lazy="joined")   # ✅ and this one too
+
+
+# Listing paths in get_all_transactions (newest first; id breaks created_at ties)
+Index(
+    "ix_transactions_reported_by_created",
+    Transaction.reported_by_id,
+    Transaction.created_at.desc(),
+    Transaction.id.desc(),
+)
+Index("ix_transactions_created", Transaction.created_at.desc(), Transaction.id.desc())
+Index("ix_transactions_periode_status", Transaction.periode_id, Transaction.status)
+Index("ix_transactions_payment_id", Transaction.payment_id)
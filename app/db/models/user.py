@@ -1,5 +1,5 @@
 # app/db/models/user.py
-from sqlalchemy import Column, Integer, String, Boolean, Enum, TIMESTAMP, text
+from sqlalchemy import Column, Integer, String, Boolean, Enum, TIMESTAMP, Index, literal_column, text
 from sqlalchemy.sql import func
 from app.db.base import Base
 import enum
@@ -23,3 +23,21 @@ class User(Base):
     image_profile_url = Column(String)
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
+def normalized_phone(value):
+    """Digits-only phone expression; must match ix_users_phone_normalized to use the index."""
+    # Inline literals: bound parameters ($2, $3, $4) would not match the index expression
+    return func.regexp_replace(value, literal_column("'[^0-9]'"), literal_column("''"), literal_column("'g'"))
+
+
+# Login lookups: each identifier kind maps to exactly one of these
+Index("ix_users_email_lower", func.lower(User.email), unique=True)
+Index("ix_users_username_lower", func.lower(User.username), unique=True)
+Index("ix_users_phone_normalized", normalized_phone(User.phone_number))
+
+# Admin member list (get_all_users): filters, then the sort key; id keeps keyset cursors unique
+Index("ix_users_created", User.created_at.desc(), User.id.desc())
+Index("ix_users_type_active_created", User.user_type, User.is_active, User.created_at.desc(), User.id.desc())
+Index("ix_users_fullname", User.fullname, User.id)
+Index("ix_users_domisili_lower", func.lower(User.domisili))
@@ -0,0 +1,106 @@
+# app/db/pool.py
+import threading
+import time
+from uuid import uuid4
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+POOL_MODES = ("queue", "null")
+
+
+class PoolMetrics:
+    """
+    Checkout statistics for one engine's pool. `wait` is the time spent in
+    the pool getting a connection: queueing for a free one, or opening a new
+    one when the pool has room (always, in null mode).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pool = None
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def stats(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            stats = {
+                "pool": type(pool).__name__ if pool is not None else None,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.wait_max * 1000, 3),
+            }
+        # Live counts only exist for queue pools
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                in_use=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+            )
+        return stats
+
+
+def _timed_pool_class(base: type, metrics: PoolMetrics) -> type:
+    # Pools are re-created by class on dispose(), so the metrics ride on the class
+    class TimedPool(base):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            metrics.pool = self
+
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                metrics.record(time.perf_counter() - started, timed_out=True)
+                raise
+            metrics.record(time.perf_counter() - started)
+            return connection
+
+    TimedPool.__name__ = base.__name__
+    return TimedPool
+
+
+def engine_options(settings, metrics: PoolMetrics, async_driver: bool, url: str) -> dict:
+    """Keyword arguments for create_engine / create_async_engine from Settings."""
+    mode = settings.DB_POOL_MODE.lower()
+    if mode not in POOL_MODES:
+        raise ValueError(f"Unknown DB_POOL_MODE {settings.DB_POOL_MODE!r}; expected one of {POOL_MODES}")
+
+    if mode == "null":
+        options = {"poolclass": _timed_pool_class(NullPool, metrics)}
+        if url.startswith("postgresql+asyncpg"):
+            # PgBouncer in transaction mode hands each transaction a different
+            # server connection, so prepared statements must not be cached or
+            # reuse names across connections
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4().hex}__",
+            }
+    else:
+        options = {
+            "poolclass": _timed_pool_class(AsyncAdaptedQueuePool if async_driver else QueuePool, metrics),
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+        }
+
+    options["pool_pre_ping"] = settings.DB_POOL_PRE_PING
+    return options
@@ -0,0 +1,137 @@
+# app/db/replica.py
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.core.cache import TTLCache
+
+# Seconds the replica is behind the primary. A replica that has replayed
+# everything it received reports 0 instead of the age of the last transaction,
+# so an idle primary does not look like lag.
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+# A replica that cannot answer the lag query this fast counts as unusable
+LAG_CHECK_TIMEOUT_SECONDS = 2
+
+# Methods that never pin a client to the primary
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def client_key(request: Request) -> str:
+    """Identify the client across requests: its bearer token, else its IP."""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return "token:" + hashlib.sha256(authorization.encode()).hexdigest()
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+
+class ReadRouter:
+    """
+    Chooses the engine for read-only requests.
+
+    Reads go to the replica unless the client wrote within the last
+    `read_your_writes` seconds (it is pinned to the primary so it sees its own
+    change), or the replica is more than `max_lag` seconds behind or
+    unreachable. Lag is sampled at most every `lag_check_interval` seconds.
+    Pins live in process memory, so a client whose next read lands on another
+    worker is only protected by the lag bound.
+    """
+
+    def __init__(
+        self,
+        replica_sessionmaker: Optional[async_sessionmaker],
+        replica_engine: Optional[AsyncEngine],
+        max_lag: float,
+        lag_check_interval: float,
+        read_your_writes: float,
+        max_pins: int = 10_000,
+    ):
+        self.replica_sessionmaker = replica_sessionmaker
+        self.replica_engine = replica_engine
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self._pins = TTLCache(max_size=max_pins, ttl=read_your_writes)
+
+        self._lock = threading.Lock()
+        self._lag_lock = asyncio.Lock()
+        self._lag: Optional[float] = None
+        self._lag_checked = 0.0
+        self._replica_healthy = True
+
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.pinned_reads = 0
+        self.lag_fallbacks = 0
+        self.replica_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica_sessionmaker is not None
+
+    def pin(self, key: str) -> None:
+        self._pins.set(key, True)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    async def _sample_lag(self) -> Optional[float]:
+        async with self.replica_engine.connect() as connection:
+            return await connection.scalar(REPLICA_LAG_SQL)
+
+    async def _replica_usable(self) -> bool:
+        if self.max_lag <= 0:
+            return True
+        if time.monotonic() - self._lag_checked < self.lag_check_interval:
+            return self._replica_healthy
+
+        async with self._lag_lock:
+            # Another request may have sampled while this one waited
+            if time.monotonic() - self._lag_checked >= self.lag_check_interval:
+                try:
+                    lag = await asyncio.wait_for(self._sample_lag(), LAG_CHECK_TIMEOUT_SECONDS)
+                    self._lag = float(lag or 0)
+                    self._replica_healthy = self._lag <= self.max_lag
+                except Exception:
+                    self._lag = None
+                    self._replica_healthy = False
+                    self._count("replica_errors")
+                self._lag_checked = time.monotonic()
+            return self._replica_healthy
+
+    async def use_replica(self, request: Request) -> bool:
+        if not self.enabled:
+            self._count("primary_reads")
+            return False
+        if self._pins.get(client_key(request)):
+            self._count("pinned_reads")
+            return False
+        if not await self._replica_usable():
+            self._count("lag_fallbacks")
+            return False
+        self._count("replica_reads")
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "max_lag_seconds": self.max_lag,
+                "last_lag_seconds": self._lag,
+                "replica_healthy": self._replica_healthy,
+                "replica_reads": self.replica_reads,
+                "primary_reads": self.primary_reads,
+                "pinned_reads": self.pinned_reads,
+                "lag_fallbacks": self.lag_fallbacks,
+                "replica_errors": self.replica_errors,
+                "pinned_clients": self._pins.stats()["size"],
+            }
@@ -0,0 +1,171 @@
+# app/db/summaries.py
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.contribution_summary import CONTRIBUTION_SUMMARY_KEY, ContributionSummary
+from app.db.models.payment import Payment
+from app.db.models.periode import Periode
+from app.db.models.transaction import Transaction, TransactionStatus
+from app.db.models.user import User
+
+# group_by name -> labelled key columns
+SUMMARY_GROUPS = {
+    "user": (Transaction.user_id.label("user_id"), User.fullname.label("user_fullname")),
+    "periode": (Transaction.periode_id.label("periode_id"), Periode.periode_name.label("periode_name")),
+    "status": (Transaction.status.label("status"),),
+    "payment": (Transaction.payment_id.label("payment_id"), Payment.payment_name.label("payment_name")),
+}
+
+# Groupings answered from contribution_summaries instead of the raw history
+SUMMARY_TABLE_GROUPS = frozenset(("user", "periode", "status"))
+
+_completed = Transaction.status == TransactionStatus.completed
+
+
+def _join_dimensions(query: Select, source, group_by: tuple[str, ...]) -> Select:
+    # Names only: join the small dimension tables for the groups that need them
+    if "user" in group_by:
+        query = query.join(User, User.id == source.user_id)
+    if "periode" in group_by:
+        query = query.outerjoin(Periode, Periode.id == source.periode_id)
+    if "payment" in group_by:
+        query = query.outerjoin(Payment, Payment.id == source.payment_id)
+    return query
+
+
+def summary_source(group_by: tuple[str, ...]):
+    """ContributionSummary when it can answer `group_by`, else Transaction."""
+    return ContributionSummary if SUMMARY_TABLE_GROUPS.issuperset(group_by) else Transaction
+
+
+def contribution_totals(group_by: tuple[str, ...]) -> Select:
+    """
+    Count and amount totals per group, with the completed / not-yet-completed
+    split. Callers add WHERE clauses on `summary_source(group_by)`, which has
+    the same user_id / periode_id / status columns either way.
+
+    Read from contribution_summaries (a few rows per member and periode) when
+    the grouping allows it; grouping by payment falls back to one FILTER
+    aggregate over transactions.
+    """
+    if summary_source(group_by) is ContributionSummary:
+        return _summary_table_totals(group_by)
+
+    keys = [column for name in group_by for column in SUMMARY_GROUPS[name]]
+    query = select(
+        *keys,
+        func.count(Transaction.id).label("count"),
+        func.coalesce(func.sum(Transaction.amount), 0).label("total_amount"),
+        func.count(Transaction.id).filter(_completed).label("completed_count"),
+        func.coalesce(func.sum(Transaction.amount).filter(_completed), 0).label("completed_amount"),
+        func.coalesce(func.sum(Transaction.amount).filter(~_completed), 0).label("pending_amount"),
+    ).select_from(Transaction)
+    query = _join_dimensions(query, Transaction, group_by)
+    return query.group_by(*keys).order_by(*keys)
+
+
+def _summary_table_totals(group_by: tuple[str, ...]) -> Select:
+    summary = ContributionSummary
+    completed = summary.status == TransactionStatus.completed
+    columns = {
+        "user": (summary.user_id.label("user_id"), User.fullname.label("user_fullname")),
+        "periode": (summary.periode_id.label("periode_id"), Periode.periode_name.label("periode_name")),
+        "status": (summary.status.label("status"),),
+    }
+    keys = [column for name in group_by for column in columns[name]]
+    query = select(
+        *keys,
+        func.coalesce(func.sum(summary.count), 0).label("count"),
+        func.coalesce(func.sum(summary.total_amount), 0).label("total_amount"),
+        func.coalesce(func.sum(summary.count).filter(completed), 0).label("completed_count"),
+        func.coalesce(func.sum(summary.total_amount).filter(completed), 0).label("completed_amount"),
+        func.coalesce(func.sum(summary.total_amount).filter(~completed), 0).label("pending_amount"),
+    ).select_from(summary)
+    query = _join_dimensions(query, summary, group_by)
+    # Keys whose transactions were all deleted keep a zero row; hide them like the aggregate would
+    return query.group_by(*keys).having(func.sum(summary.count) > 0).order_by(*keys)
+
+
+def _upsert(dialect_name: str):
+    if dialect_name == "sqlite":
+        # Only the SQLite test databases need it; not imported at start-up
+        from sqlalchemy.dialects import sqlite
+
+        return sqlite.insert
+    return postgresql.insert
+
+
+async def apply_contribution_deltas(db: AsyncSession, deltas: dict) -> None:
+    """
+    Add `{(user_id, periode_id, status): (count, amount)}` (negative to
+    remove) to contribution_summaries in one multi-row upsert, creating rows
+    on first use. Runs in the caller's transaction, so the summary commits or
+    rolls back together with the transactions write.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta[0]}
+    if not deltas:
+        return
+    insert = _upsert(db.bind.dialect.name)
+    statement = insert(ContributionSummary).values([
+        dict(
+            user_id=user_id,
+            periode_id=periode_id,
+            status=status,
+            count=count,
+            total_amount=Decimal(str(amount)),
+        )
+        for (user_id, periode_id, status), (count, amount) in deltas.items()
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=list(CONTRIBUTION_SUMMARY_KEY),
+        set_={
+            "count": ContributionSummary.count + statement.excluded.count,
+            "total_amount": ContributionSummary.total_amount + statement.excluded.total_amount,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(statement)
+
+
+async def apply_contribution_delta(
+    db: AsyncSession,
+    user_id: int,
+    periode_id: Optional[int],
+    status: TransactionStatus,
+    count: int,
+    amount,
+) -> None:
+    """Single-key apply_contribution_deltas."""
+    await apply_contribution_deltas(db, {(user_id, periode_id, status): (count, amount)})
+
+
+def add_status_move(deltas: dict, user_id: int, periode_id: Optional[int], old_status, new_status, amount) -> None:
+    """Accumulate one transaction moving from `old_status` to `new_status` into `deltas`."""
+    if old_status == new_status:
+        return
+    for status, sign in ((old_status, -1), (new_status, 1)):
+        count, total = deltas.get((user_id, periode_id, status), (0, 0))
+        deltas[(user_id, periode_id, status)] = (count + sign, total + sign * amount)
+
+
+async def move_contribution(db: AsyncSession, transaction: Transaction, old_status: TransactionStatus) -> None:
+    """Move one transaction from its `old_status` row to its current status row."""
+    deltas: dict = {}
+    add_status_move(
+        deltas, transaction.user_id, transaction.periode_id, old_status, transaction.status, transaction.amount
+    )
+    await apply_contribution_deltas(db, deltas)
+
+
+# Full recomputation, used by app.commands.rebuild_contribution_summaries
+CONTRIBUTION_TOTALS_FROM_TRANSACTIONS = select(
+    Transaction.user_id,
+    Transaction.periode_id,
+    Transaction.status,
+    func.count(Transaction.id).label("count"),
+    func.coalesce(func.sum(Transaction.amount), 0).label("total_amount"),
+).group_by(Transaction.user_id, Transaction.periode_id, Transaction.status)
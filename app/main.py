@@ -1,16 +1,31 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.routes.health import router as health_router
-from app.api.routes import auth, periode, payment, transaction, user  # import the new router
-from app.db.base import Base
-from app.db.session import engine
+from app.api.routes import auth, imports, periode, payment, transaction, user  # import the new router
+from app.db.instrumentation import SQLTimingMiddleware
+from app.db.replica import SAFE_METHODS, client_key
+from app.db.session import async_engine, read_router, replica_engine
 from fastapi.openapi.utils import get_openapi
 from app.core.exception_handler import init_exception_handlers
+from app.core.security import password_pool, warm_up_password_pool
+
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Worker processes boot while the app finishes starting, not on the first login
+    warm_up_password_pool()
+    yield
+    password_pool.shutdown()
+    await async_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
 
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title=settings.APP_NAME)
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 # ✅ Register global exception handlers
 init_exception_handlers(app)
@@ -23,12 +38,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if read_router.enabled:
+    # Read-your-writes: after a successful write the client reads from the primary for a while
+    @app.middleware("http")
+    async def pin_writers_to_primary(request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            read_router.pin(client_key(request))
+        return response
+
+if settings.SQL_TIMING_ENABLED:
+    # Added last so it wraps everything, including the read-your-writes middleware
+    app.add_middleware(SQLTimingMiddleware, slow_ms=settings.SLOW_REQUEST_MS)
+
 app.include_router(health_router, prefix=settings.API_PREFIX)
 app.include_router(auth.router)
 app.include_router(periode.router)
 app.include_router(payment.router)
 app.include_router(transaction.router)
 app.include_router(user.router)
+app.include_router(imports.router)
 
 @app.get("/")
 def root():
@@ -58,7 +87,3 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
-
-print("✅ Loaded config:")
-print("DB URL:", settings.DATABASE_URL)
-print("SECRET:", settings.SECRET_KEY[:5] + "*****")
@@ -0,0 +1,56 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
+
+from app.schemas.transaction import TransactionStatus
+
+
+# 📥 One row of a member import (CSV header / JSON keys)
+class UserImportRow(BaseModel):
+    model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
+
+    fullname: str = Field(min_length=1, max_length=100)
+    username: str = Field(min_length=1, max_length=50)
+    email: EmailStr = Field(max_length=100)
+    password: str = Field(min_length=1)
+    phone_number: Optional[str] = Field(None, max_length=20)
+    domisili: Optional[str] = Field(None, max_length=100)
+    user_type: Literal["admin", "member"] = "member"
+
+
+# 📥 One row of a transaction back-fill; the member is given by user_id or username
+class TransactionImportRow(BaseModel):
+    model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
+
+    user_id: Optional[int] = None
+    username: Optional[str] = Field(None, max_length=50)
+    amount: Decimal = Field(gt=0, max_digits=12, decimal_places=2)
+    transaction_date: datetime
+    status: TransactionStatus = TransactionStatus.sent
+    periode_id: Optional[int] = None
+    payment_id: Optional[int] = None
+    bukti_transfer_url: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _member(self):
+        if self.user_id is None and not self.username:
+            raise ValueError("user_id or username is required")
+        return self
+
+
+class ImportRowError(BaseModel):
+    row: int  # 1-based record number (CSV: header excluded)
+    field: Optional[str] = None
+    message: str
+
+
+class ImportReport(BaseModel):
+    kind: Literal["users", "transactions"]
+    dry_run: bool = False
+    rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: list[ImportRowError] = []
+    errors_truncated: bool = False
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from enum import Enum
 from app.schemas.payment import PaymentOut
 from app.schemas.periode import PeriodeOut
@@ -41,6 +41,39 @@ class TransactionUpdateStatus(BaseModel):
     status: TransactionStatus
 
 
+# 🟠 Bulk status update (admin): explicit ids, or every transaction matching the filter
+BULK_STATUS_MAX_IDS = 1000
+
+
+class TransactionBulkStatusUpdate(BaseModel):
+    status: TransactionStatus
+    ids: Optional[list[int]] = Field(None, min_length=1, max_length=BULK_STATUS_MAX_IDS)
+    periode_id: Optional[int] = None
+    current_status: Optional[TransactionStatus] = None
+
+    @model_validator(mode="after")
+    def _one_selector(self):
+        if self.ids is None and self.periode_id is None:
+            raise ValueError("Provide ids, or periode_id (optionally with current_status)")
+        if self.ids is not None and (self.periode_id is not None or self.current_status is not None):
+            raise ValueError("ids cannot be combined with periode_id / current_status")
+        return self
+
+
+class TransactionBulkStatusResult(BaseModel):
+    id: int
+    outcome: Literal["updated", "unchanged", "not_found"]
+    old_status: Optional[TransactionStatus] = None
+
+
+class TransactionBulkStatusOut(BaseModel):
+    status: TransactionStatus
+    updated: int
+    unchanged: int
+    not_found: int
+    results: list[TransactionBulkStatusResult]
+
+
 # 🔵 Response model with nested relations
 class TransactionOut(TransactionBase):
     id: int
@@ -58,3 +91,39 @@ class TransactionOut(TransactionBase):
 
     class Config:
         from_attributes = True
+
+
+# 📊 Contribution totals for one group (keys not grouped by stay None)
+class TransactionSummaryRow(BaseModel):
+    user_id: Optional[int] = None
+    user_fullname: Optional[str] = None
+    periode_id: Optional[int] = None
+    periode_name: Optional[str] = None
+    status: Optional[TransactionStatus] = None
+    payment_id: Optional[int] = None
+    payment_name: Optional[str] = None
+
+    count: int
+    total_amount: float
+    completed_count: int
+    completed_amount: float
+    pending_amount: float
+
+
+# 📊 Members x periodes matrix: values[str(periode_id)] per member
+class PivotPeriode(BaseModel):
+    id: Optional[int] = None
+    periode_name: Optional[str] = None
+
+
+class PivotRow(BaseModel):
+    user_id: int
+    user_fullname: Optional[str] = None
+    values: dict[str, float]
+    total: float
+
+
+class TransactionPivot(BaseModel):
+    value: str
+    periodes: list[PivotPeriode]
+    rows: list[PivotRow]
@@ -69,3 +69,8 @@ class BaseResponse(BaseModel):
     code: int
     message: str
     data: Optional[object] = None
+
+# Wrapper for paginated lists: pass `next_cursor` back as `cursor` for the next page
+class PaginatedResponse(BaseResponse):
+    next_cursor: Optional[str] = None
+    approximate_total: Optional[int] = None
@@ -1,14 +1,22 @@
-import cloudinary
-import cloudinary.uploader
+from functools import lru_cache
+
 from fastapi import UploadFile, HTTPException
 from app.core.config import settings
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET
-)
+
+@lru_cache(maxsize=1)
+def _uploader():
+    # The SDK (and its urllib3/certifi stack) is imported on the first upload,
+    # not at app start-up
+    import cloudinary
+    import cloudinary.uploader
+
+    cloudinary.config(
+        cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+        api_key=settings.CLOUDINARY_API_KEY,
+        api_secret=settings.CLOUDINARY_API_SECRET
+    )
+    return cloudinary.uploader
 
 def upload_image(file: UploadFile) -> str:
     """
@@ -17,10 +25,10 @@ def upload_image(file: UploadFile) -> str:
     try:
         # Read file content
         content = file.file.read()
-        
+
         # Upload to Cloudinary
-        response = cloudinary.uploader.upload(content)
-        
+        response = _uploader().upload(content)
+
         return response.get("secure_url")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
@@ -0,0 +1,71 @@
+# app/utils/conditional.py
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over `parts` (validator values, the query string, the caller)."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive timestamps (users.updated_at) are stored as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> dict:
+    # private: bodies depend on the caller; no-cache: always revalidate, which is what makes 304s useful
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """
+    A bodiless 304 when the client's copy is current, else None. Call it with
+    validators from a cheap query, before loading and serializing the page.
+    If-None-Match wins; If-Modified-Since is only consulted without it.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        matched = _etag_matches(if_none_match, etag)
+    elif last_modified is not None and request.headers.get("if-modified-since"):
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"])
+        except (TypeError, ValueError):
+            return None
+        matched = since.tzinfo is not None and _as_utc(last_modified).replace(microsecond=0) <= since
+    else:
+        matched = False
+
+    if not matched:
+        return None
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+
+async def page_validator(db: AsyncSession, page_query: Select, *columns) -> tuple:
+    """
+    `columns` (id, updated_at) of every row in the requested page window: the
+    keyset page query, LIMIT limit + 1 included, narrowed to those columns.
+    Costs the same index range scan as the page itself however large the
+    filtered set is, and changes with any insert, delete or touched
+    `updated_at` that would change the page or its next_cursor.
+    """
+    window = page_query.with_only_columns(*columns, maintain_column_froms=True)
+    return tuple(tuple(row) for row in (await db.execute(window)).all())
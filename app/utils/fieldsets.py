@@ -0,0 +1,59 @@
+# app/utils/fieldsets.py
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import load_only
+
+
+def parse_fields(fields: Optional[str], model: type[BaseModel]) -> Optional[frozenset]:
+    """
+    `?fields=id,amount,status` -> frozenset of top-level field names of
+    `model`, or None (= every field) when the parameter is absent or empty.
+    """
+    if not fields or not fields.strip():
+        return None
+    requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Allowed: {', '.join(model.model_fields)}",
+        )
+    return requested
+
+
+@lru_cache(maxsize=128)
+def _subset_model(model: type[BaseModel], fields: frozenset) -> type[BaseModel]:
+    # Keep the declared order, types and defaults of the full model
+    definitions = {
+        name: (info.annotation, info)
+        for name, info in model.model_fields.items()
+        if name in fields
+    }
+    return create_model(
+        f"{model.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+def response_model_for(model: type[BaseModel], fields: Optional[frozenset]) -> type[BaseModel]:
+    """`model` itself, or a cached lightweight model with only `fields`."""
+    return model if fields is None else _subset_model(model, fields)
+
+
+def load_only_columns(entity, fields: Iterable[str], always: Iterable = ()):
+    """
+    load_only() over the mapped columns named in `fields` plus `always`
+    (sort keys, foreign keys needed by relationship loaders). Names that are
+    relationships are ignored here; the caller decides how to load those.
+    """
+    columns = sa_inspect(entity).column_attrs
+    attributes = {name: getattr(entity, name) for name in fields if name in columns}
+    for attribute in always:
+        attributes.setdefault(attribute.key, attribute)
+    return load_only(*attributes.values())
@@ -0,0 +1,95 @@
+# app/utils/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(sort: str, *values) -> str:
+    keys = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    payload = {"s": sort, "k": keys}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, columns: Sequence) -> list:
+    """
+    Cursor values, converted back to the Python type of each sort column. A
+    cursor issued under another sort order is rejected: its key would be
+    compared against different columns (or the same ones in reverse) and
+    silently skip or repeat rows.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        issued_for, values = payload["s"], payload["k"]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if issued_for != sort:
+        raise HTTPException(status_code=400, detail=f"Cursor was issued for a different sort order, not {sort!r}")
+
+    try:
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort columns")
+        return [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else column.type.python_type(value)
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(
+    query: Select,
+    columns: Sequence,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+    *,
+    sort: str,
+) -> Select:
+    """
+    Page of `query` ordered by `columns` (unique together, e.g. ending in the
+    primary key) after `cursor`. The row-value comparison and ORDER BY match a
+    composite index on the same columns, so every page is an index range scan
+    of `limit + 1` rows however deep it is. The extra row tells the caller
+    whether there is a next page. `sort` names the order for the cursor.
+    """
+    if cursor:
+        key = tuple_(*columns)
+        values = tuple_(*decode_cursor(cursor, sort, columns))
+        query = query.where(key < values if descending else key > values)
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def next_page_cursor(rows: list, limit: int, columns: Sequence, sort: str) -> tuple[list, Optional[str]]:
+    """Trim the look-ahead row and return (page, next_cursor)."""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(sort, *(getattr(page[-1], column.key) for column in columns))
+
+
+async def approximate_count(db: AsyncSession, query: Select) -> Optional[int]:
+    """
+    Planner row estimate for `query` (Postgres statistics, no scan). Good
+    enough for "about N results"; None on other databases.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return None
+    # First column only: no entity, so no eager-load joins in the estimate
+    query = query.with_only_columns(query.selected_columns[0], maintain_column_froms=True)
+    compiled = query.limit(None).order_by(None).compile(
+        dialect=db.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,71 @@
+"""
+Encode/decode throughput per JWT backend and signing algorithm.
+
+    python bench_jwt_backends.py [iterations]
+
+Keys are generated on the fly; no settings or database are needed. Use the
+numbers to choose JWT_BACKEND and ALGORITHM.
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+from functools import partial
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from app.core.tokens import BACKENDS, TokenSigner
+
+
+def private_pem(key) -> str:
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+SIGNING_KEYS = {
+    "HS256": "bench-secret-" + "x" * 48,
+    "ES256": private_pem(ec.generate_private_key(ec.SECP256R1())),
+    "EdDSA": private_pem(ed25519.Ed25519PrivateKey.generate()),
+}
+
+
+def rate(fn, iterations) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - started)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    claims = {
+        "sub": "bench@talangraga.com",
+        "uid": 1,
+        "role": "member",
+        "exp": datetime.utcnow() + timedelta(days=7),
+    }
+
+    print(f"{'backend':<8} {'algorithm':<9} {'encode/s':>12} {'decode/s':>12} {'token bytes':>12}")
+    for name, backend_cls in BACKENDS.items():
+        try:
+            backend = backend_cls()
+        except RuntimeError as exc:
+            print(f"{name:<8} skipped: {exc}")
+            continue
+
+        for algorithm, key in SIGNING_KEYS.items():
+            if algorithm not in backend.algorithms:
+                print(f"{name:<8} {algorithm:<9} {'unsupported':>12}")
+                continue
+            signer = TokenSigner(backend, algorithm, key, key_id="bench")
+            token = signer.encode(claims)
+            encode_rate = rate(partial(signer.encode, claims), iterations)
+            decode_rate = rate(partial(signer.decode, token), iterations)
+            print(f"{name:<8} {algorithm:<9} {encode_rate:>12,.0f} {decode_rate:>12,.0f} {len(token):>12}")
+
+
+if __name__ == "__main__":
+    main()
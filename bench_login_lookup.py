@@ -0,0 +1,142 @@
+"""
+EXPLAIN-backed benchmark for the login lookup.
+
+Seeds a scratch copy of `users` with 100k rows in its own schema, then compares
+the old `email = x OR username = x OR phone_number = x` query with the
+classified single-index lookups, before and after the login indexes exist.
+
+The lookups and indexes are built from the app's own expressions
+(`normalized_phone`, the `users` Index definitions) and compiled for asyncpg,
+then run as prepared statements under both custom and generic plans, so the
+plans are the ones the app gets.
+
+    DATABASE_URL=postgresql://... python bench_login_lookup.py [rows]
+
+Everything is created in schema `bench_login` and dropped afterwards.
+"""
+import os
+import sys
+import time
+
+from sqlalchemy import create_engine, func, literal_column, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.schema import CreateIndex
+
+from app.db.models.user import User, normalized_phone
+
+SCHEMA = "bench_login"
+
+OLD_QUERY = """
+SELECT * FROM users
+WHERE email = :identifier OR username = :identifier OR phone_number = :identifier
+LIMIT 1
+"""
+
+# find_user_by_identifier's conditions; it lowercases / strips the identifier in Python
+APP_LOOKUPS = {
+    "email": (lambda identifier: func.lower(User.email) == identifier, "user{n}@bench.test"),
+    "username": (lambda identifier: func.lower(User.username) == identifier, "user{n}"),
+    "phone": (lambda identifier: normalized_phone(User.phone_number) == identifier, "0812{n:08d}"),
+}
+
+LOGIN_INDEXES = [
+    index
+    for index in User.__table__.indexes
+    if index.name in ("ix_users_email_lower", "ix_users_username_lower", "ix_users_phone_normalized")
+]
+
+
+def app_lookup(condition):
+    """(SQL, positional arguments) exactly as the asyncpg dialect sends the lookup."""
+    statement = select(literal_column("*")).select_from(User.__table__).where(condition).limit(1)
+    compiled = statement.compile(dialect=asyncpg_dialect())
+    return str(compiled), tuple(compiled.params[name] for name in compiled.positiontup)
+
+
+def explain_prepared(conn, sql, args, plan_cache_mode, runs=50):
+    # asyncpg prepares every statement; after a few runs Postgres may switch to a generic plan
+    conn.exec_driver_sql(f"SET plan_cache_mode = {plan_cache_mode}")
+    conn.exec_driver_sql(f"PREPARE lookup AS {sql}")
+    placeholders = ", ".join(["%s"] * len(args))
+    try:
+        plan = conn.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) EXECUTE lookup({placeholders})", args
+        ).scalars().all()
+
+        started = time.perf_counter()
+        for _ in range(runs):
+            conn.exec_driver_sql(f"EXECUTE lookup({placeholders})", args).first()
+        avg_ms = (time.perf_counter() - started) / runs * 1000
+    finally:
+        conn.exec_driver_sql("DEALLOCATE lookup")
+        conn.exec_driver_sql("RESET plan_cache_mode")
+    return plan, avg_ms
+
+
+def explain(conn, sql, identifier, runs=50):
+    plan = conn.execute(
+        text(f"EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) {sql}"), {"identifier": identifier}
+    ).scalars().all()
+
+    started = time.perf_counter()
+    for _ in range(runs):
+        conn.execute(text(sql), {"identifier": identifier}).first()
+    avg_ms = (time.perf_counter() - started) / runs * 1000
+    return plan, avg_ms
+
+
+def report(title, plan, avg_ms):
+    print(f"\n--- {title}: {avg_ms:.3f} ms/query")
+    for line in plan:
+        print("   ", line)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    url = os.environ["DATABASE_URL"].replace("postgresql://", "postgresql+psycopg2://", 1)
+    engine = create_engine(url)
+    probe = rows // 2
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET search_path TO {SCHEMA}"))
+        conn.execute(text("""
+            CREATE TABLE users (
+                id serial PRIMARY KEY,
+                fullname varchar(100) NOT NULL,
+                username varchar(50) UNIQUE NOT NULL,
+                email varchar(100) UNIQUE NOT NULL,
+                password varchar(255) NOT NULL,
+                phone_number varchar(20)
+            )
+        """))
+        print(f"Seeding {rows:,} users...")
+        conn.execute(text("""
+            INSERT INTO users (fullname, username, email, password, phone_number)
+            SELECT 'Member ' || n, 'user' || n, 'user' || n || '@bench.test', 'x',
+                   '0812-' || lpad(n::text, 8, '0')
+            FROM generate_series(1, :rows) AS n
+        """), {"rows": rows})
+        conn.execute(text("ANALYZE users"))
+
+        phone = f"0812-{probe:08d}"
+        for kind, identifier in (("email", f"user{probe}@bench.test"), ("username", f"user{probe}"), ("phone", phone)):
+            report(f"BEFORE  OR-query by {kind}", *explain(conn, OLD_QUERY, identifier))
+
+        for index in LOGIN_INDEXES:
+            conn.execute(CreateIndex(index).compile(dialect=postgresql.dialect()))
+        conn.execute(text("ANALYZE users"))
+
+        for kind, (condition, template) in APP_LOOKUPS.items():
+            sql, args = app_lookup(condition(template.format(n=probe)))
+            print(f"\n{kind} lookup as sent by the app:\n    {' '.join(sql.split())}")
+            for mode in ("force_custom_plan", "force_generic_plan"):
+                report(f"AFTER   {kind} lookup, {mode}", *explain_prepared(conn, sql, args, mode))
+
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
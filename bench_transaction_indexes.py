@@ -0,0 +1,136 @@
+"""
+EXPLAIN ANALYZE benchmark for the transactions listing and filter paths.
+
+Seeds a scratch `transactions` table (1M rows by default) in its own schema,
+runs the queries issued by GET /transactions/ without the listing indexes,
+then builds them and runs the same queries again.
+
+    DATABASE_URL=postgresql://... python bench_transaction_indexes.py [rows]
+
+Everything is created in schema `bench_transactions` and dropped afterwards.
+"""
+import os
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+
+SCHEMA = "bench_transactions"
+USERS = 2_000
+PERIODES = 24
+PAYMENTS = 6
+
+# Same definitions as migration a912436e53994c8d837a87afb13b5249
+LISTING_INDEXES = [
+    "CREATE INDEX ix_transactions_reported_by_created ON transactions (reported_by_id, created_at DESC, id DESC)",
+    "CREATE INDEX ix_transactions_created ON transactions (created_at DESC, id DESC)",
+    "CREATE INDEX ix_transactions_periode_status ON transactions (periode_id, status)",
+    "CREATE INDEX ix_transactions_payment_id ON transactions (payment_id)",
+]
+
+# keyset_page fetches a page of 50 plus one look-ahead row
+PAGE = {"limit": 51}
+
+QUERIES = {
+    "member, first page": (
+        "SELECT * FROM transactions WHERE reported_by_id = :user_id ORDER BY created_at DESC, id DESC LIMIT :limit",
+        {"user_id": USERS // 2, **PAGE},
+    ),
+    "admin, first page": (
+        "SELECT * FROM transactions ORDER BY created_at DESC, id DESC LIMIT :limit",
+        PAGE,
+    ),
+    "periode + status": (
+        "SELECT * FROM transactions WHERE periode_id = :periode_id AND status = 'sent' "
+        "ORDER BY created_at DESC, id DESC LIMIT :limit",
+        {"periode_id": PERIODES // 2, **PAGE},
+    ),
+    "payment, first page": (
+        "SELECT * FROM transactions WHERE payment_id = :payment_id ORDER BY created_at DESC, id DESC LIMIT :limit",
+        {"payment_id": 3, **PAGE},
+    ),
+}
+
+
+def explain(conn, sql, params, runs=20):
+    plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) {sql}"), params).scalars().all()
+
+    started = time.perf_counter()
+    for _ in range(runs):
+        conn.execute(text(sql), params).all()
+    avg_ms = (time.perf_counter() - started) / runs * 1000
+    return plan, avg_ms
+
+
+def report(title, plan, avg_ms):
+    print(f"\n--- {title}: {avg_ms:.3f} ms/query")
+    for line in plan:
+        print("   ", line)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    url = os.environ["DATABASE_URL"].replace("postgresql://", "postgresql+psycopg2://", 1)
+    engine = create_engine(url)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET search_path TO {SCHEMA}"))
+        conn.execute(text("CREATE TYPE transactionstatus AS ENUM ('sent', 'on_process', 'completed')"))
+        conn.execute(text("""
+            CREATE TABLE transactions (
+                id serial PRIMARY KEY,
+                amount numeric(12, 2) NOT NULL,
+                transaction_date timestamptz NOT NULL,
+                status transactionstatus NOT NULL,
+                bukti_transfer_url text,
+                user_id integer NOT NULL,
+                reported_by_id integer NOT NULL,
+                confirmed_by_id integer,
+                periode_id integer,
+                payment_id integer,
+                reported_date timestamptz DEFAULT now(),
+                created_at timestamptz DEFAULT now(),
+                updated_at timestamptz
+            )
+        """))
+        print(f"Seeding {rows:,} transactions...")
+        # Status steps once per round of periodes, so every periode has every status
+        conn.execute(text("""
+            INSERT INTO transactions (
+                amount, transaction_date, status, bukti_transfer_url, user_id,
+                reported_by_id, periode_id, payment_id, created_at
+            )
+            SELECT 500000, ts, (ARRAY['sent', 'on_process', 'completed'])[1 + (n / :periodes) % 3]::transactionstatus,
+                   'https://res.cloudinary.com/bench/' || n || '.jpg',
+                   1 + n % :users, 1 + n % :users, 1 + n % :periodes, 1 + n % :payments, ts
+            FROM generate_series(1, :rows) AS n,
+                 LATERAL (SELECT now() - (n || ' minutes')::interval AS ts) AS t
+        """), {"rows": rows, "users": USERS, "periodes": PERIODES, "payments": PAYMENTS})
+        conn.execute(text("ANALYZE transactions"))
+
+        results = {}
+        for name, (sql, params) in QUERIES.items():
+            plan, before_ms = explain(conn, sql, params)
+            report(f"BEFORE  {name}", plan, before_ms)
+            results[name] = before_ms
+
+        for statement in LISTING_INDEXES:
+            conn.execute(text(statement))
+        conn.execute(text("ANALYZE transactions"))
+
+        for name, (sql, params) in QUERIES.items():
+            plan, after_ms = explain(conn, sql, params)
+            report(f"AFTER   {name}", plan, after_ms)
+            results[name] = (results[name], after_ms)
+
+        print(f"\n{'query':<26} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+        for name, (before_ms, after_ms) in results.items():
+            print(f"{name:<26} {before_ms:>10.2f} {after_ms:>10.2f} {before_ms / after_ms:>7.1f}x")
+
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 #!/bin/bash
 set -e
 
-# Run Alembic migrations
-alembic upgrade head
+# Bring the schema up to date (set RUN_MIGRATIONS=0 when migrations run as a
+# separate release / pre-deploy step, so instances start straight into uvicorn)
+if [ "${RUN_MIGRATIONS:-1}" = "1" ]; then
+    python -m app.commands.migrate
+fi
 
 # Start FastAPI (uvicorn)
 exec "$@"
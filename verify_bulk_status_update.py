@@ -0,0 +1,80 @@
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+
+def _row(id, old_status, changed, user_id=None, periode_id=None, amount=None):
+    return SimpleNamespace(
+        id=id, old_status=old_status, changed=changed, user_id=user_id, periode_id=periode_id, amount=amount
+    )
+
+
+def verify_bulk_status_update_logic():
+    print("Verifying bulk_update_transaction_status logic...")
+
+    # The statement is PostgreSQL-only (data-modifying CTE), so the session is
+    # mocked and the SQL is checked as the postgresql dialect renders it
+    with patch("app.api.routes.transaction.get_db"), \
+         patch("app.api.routes.transaction.require_admin"), \
+         patch("app.api.routes.transaction.apply_contribution_deltas") as mock_apply_deltas:
+
+        from app.api.routes.transaction import bulk_update_transaction_status
+        from app.api.routes.auth import CurrentPrincipal
+        from app.db.models.transaction import TransactionStatus
+        from app.schemas.transaction import TransactionBulkStatusUpdate
+
+        mock_admin = MagicMock(spec=CurrentPrincipal)
+        mock_admin.id = 1
+
+        mock_db = AsyncMock()
+        mock_db.execute.return_value = MagicMock(all=MagicMock(return_value=[
+            _row(3, TransactionStatus.sent, True, user_id=10, periode_id=1, amount=Decimal("100.00")),
+            _row(5, TransactionStatus.completed, False),
+        ]))
+
+        print("\nTest Case 1: ids=[5, 3, 7] -> completed")
+        response = asyncio.run(bulk_update_transaction_status(
+            request=TransactionBulkStatusUpdate(status="completed", ids=[5, 3, 7]),
+            db=mock_db,
+            current_user=mock_admin,
+        ))
+
+        statement = mock_db.execute.call_args[0][0]
+        sql = " ".join(str(statement.compile(dialect=postgresql.dialect())).split())
+        assert "ORDER BY transactions.id FOR UPDATE" in sql, sql
+        assert "targets.old_status != " in sql, sql
+        print("  ✅ Targets locked in id order; rows already in the new status are not updated")
+
+        data = response.data
+        outcomes = {result.id: result.outcome for result in data.results}
+        assert outcomes == {3: "updated", 5: "unchanged", 7: "not_found"}, outcomes
+        assert (data.updated, data.unchanged, data.not_found) == (1, 1, 1)
+        print("  ✅ Outcomes: 3 updated, 5 unchanged, 7 not_found")
+
+        deltas = mock_apply_deltas.call_args[0][1]
+        assert deltas == {
+            (10, 1, TransactionStatus.sent): (-1, Decimal("-100.00")),
+            (10, 1, TransactionStatus.completed): (1, Decimal("100.00")),
+        }, deltas
+        mock_db.commit.assert_awaited_once()
+        print("  ✅ Summary deltas only for the updated row, committed once")
+
+        print("\nTest Case 2: periode_id=1, current_status=sent -> on_process")
+        mock_db.reset_mock()
+        mock_db.execute.return_value = MagicMock(all=MagicMock(return_value=[]))
+        response = asyncio.run(bulk_update_transaction_status(
+            request=TransactionBulkStatusUpdate(status="on_process", periode_id=1, current_status="sent"),
+            db=mock_db,
+            current_user=mock_admin,
+        ))
+        sql = " ".join(str(mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect())).split())
+        assert "transactions.periode_id = " in sql and "transactions.status = " in sql, sql
+        assert response.data.results == [] and response.data.updated == 0
+        print("  ✅ Filter selector builds the same statement; empty match reports nothing")
+
+
+if __name__ == "__main__":
+    verify_bulk_status_update_logic()
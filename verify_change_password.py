@@ -1,4 +1,5 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi import HTTPException
 from app.schemas.user import UserChangePassword
 
@@ -8,8 +9,8 @@ def verify_change_password_logic():
     # Patch dependencies
     with patch("app.api.routes.user.get_db"), \
          patch("app.api.routes.user.get_current_user"), \
-         patch("app.api.routes.user.verify_password") as mock_verify_password, \
-         patch("app.api.routes.user.hash_password") as mock_hash_password:
+         patch("app.api.routes.user.verify_password_async") as mock_verify_password, \
+         patch("app.api.routes.user.hash_password_async") as mock_hash_password:
 
         from app.api.routes.user import change_password
         from app.db.models.user import User
@@ -19,7 +20,7 @@ def verify_change_password_logic():
         mock_user.password = "hashed_current_password"
         
         # Setup mock db
-        mock_db = MagicMock()
+        mock_db = AsyncMock()
 
         # Test Case 1: Success
         print("\nTest Case 1: Change Password Success...")
@@ -32,11 +33,11 @@ def verify_change_password_logic():
             confirm_new_password="new_password"
         )
 
-        response = change_password(
+        response = asyncio.run(change_password(
             password_data=payload,
             db=mock_db,
             current_user=mock_user
-        )
+        ))
 
         assert mock_user.password == "hashed_new_password"
         assert response.code == 200
@@ -53,11 +54,11 @@ def verify_change_password_logic():
         )
 
         try:
-            change_password(
+            asyncio.run(change_password(
                 password_data=payload_wrong,
                 db=mock_db,
                 current_user=mock_user
-            )
+            ))
         except HTTPException as e:
             assert e.status_code == 400
             assert e.detail == "Password saat ini salah"
@@ -0,0 +1,67 @@
+import base64
+import json
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.api.routes.user import USER_SORTS
+from app.db.models.user import User
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_page
+
+
+def _decode_status(cursor, sort):
+    columns, _ = USER_SORTS[sort]
+    try:
+        decode_cursor(cursor, sort, columns)
+    except HTTPException as exc:
+        return exc.status_code, exc.detail
+    return 200, None
+
+
+def verify_cursor_sort():
+    print("Verifying keyset cursors are bound to their sort order...")
+
+    newest = encode_cursor("newest", "2026-01-05T00:00:00", 42)
+    name = encode_cursor("name", "Budi", 42)
+
+    print("\nTest Case 1: newest cursor decoded under newest")
+    columns, _ = USER_SORTS["newest"]
+    values = decode_cursor(newest, "newest", columns)
+    if values[1] == 42 and values[0].year == 2026:
+        print("  ✅ Cursor round-trips to the sort column types.")
+    else:
+        print(f"  ❌ Unexpected cursor values: {values}")
+
+    print("\nTest Case 2: newest cursor replayed with sort=oldest (same columns, reversed)")
+    status_code, detail = _decode_status(newest, "oldest")
+    if status_code == 400 and "different sort order" in detail:
+        print(f"  ✅ Rejected with 400: {detail}")
+    else:
+        print(f"  ❌ Expected 400, got {status_code}")
+
+    print("\nTest Case 3: name cursor replayed with sort=newest (different columns)")
+    status_code, detail = _decode_status(name, "newest")
+    if status_code == 400 and "different sort order" in detail:
+        print(f"  ✅ Rejected with 400: {detail}")
+    else:
+        print(f"  ❌ Expected 400, got {status_code}")
+
+    print("\nTest Case 4: cursor in the old bare-list format")
+    legacy = base64.urlsafe_b64encode(json.dumps(["2026-01-05T00:00:00", 42]).encode()).decode().rstrip("=")
+    status_code, detail = _decode_status(legacy, "newest")
+    if status_code == 400 and detail == "Invalid cursor":
+        print("  ✅ Rejected with 400 Invalid cursor.")
+    else:
+        print(f"  ❌ Expected 400, got {status_code}")
+
+    print("\nTest Case 5: keyset_page rejects a mismatched cursor before building SQL")
+    columns, descending = USER_SORTS["name"]
+    try:
+        keyset_page(select(User), columns, newest, 10, descending=descending, sort="name")
+        print("  ❌ keyset_page accepted a newest cursor for sort=name")
+    except HTTPException as exc:
+        print(f"  ✅ keyset_page raised {exc.status_code}.")
+
+
+if __name__ == "__main__":
+    verify_cursor_sort()
@@ -0,0 +1,80 @@
+"""
+Cold-start budget for `import app.main`, measured with `python -X importtime`.
+
+    python verify_import_time.py [budget_ms]
+
+Imports the app in IMPORT_RUNS fresh interpreters and takes, for every
+module, its fastest self time across the runs; the start-up cost is the sum.
+A single noisy run then only inflates the few modules it was slow on, which
+keeps the number steadier than the best whole run on small shared instances.
+
+Fails when that cost exceeds the budget or when a module that should load
+lazily shows up at start-up. The budget is BASELINE_MS (recorded on a
+1 vCPU instance) plus BUDGET_MARGIN; pass a budget or set IMPORT_BUDGET_MS
+to measure elsewhere, and lower BASELINE_MS when start-up gets faster.
+"""
+import os
+import subprocess
+import sys
+
+# Median of 10 measurements (sum of per-module best self times) on a 1 vCPU
+# instance, Python 3.11; they ranged from 885 to 1160 ms
+BASELINE_MS = 1050
+# Covers that spread with room to spare; a real regression still has to be ~300 ms
+BUDGET_MARGIN = 0.3
+RUNS = int(os.environ.get("IMPORT_RUNS", "5"))
+
+# Loaded on first use, never on import
+LAZY_MODULES = ("cloudinary", "app.db.imports", "app.schemas.imports", "sqlalchemy.dialects.sqlite")
+
+
+def import_times() -> dict[str, tuple[int, int]]:
+    """module -> (self_us, cumulative_us) for one cold `import app.main`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode != 0:
+        sys.exit(f"import app.main failed:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    default_budget = BASELINE_MS * (1 + BUDGET_MARGIN)
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else float(os.environ.get("IMPORT_BUDGET_MS", default_budget))
+
+    runs = [import_times() for _ in range(RUNS)]
+    # Fastest self time per module; every run imports the same modules
+    best = {name: min(run[name][0] for run in runs if name in run) for name in runs[0]}
+    total_ms = sum(best.values()) / 1000
+
+    print(f"slowest modules (best self time of {RUNS} runs):")
+    for name, self_us in sorted(best.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    eager = [name for name in best if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)]
+    if eager:
+        print(f"❌ imported at start-up but should be lazy: {', '.join(sorted(eager))}")
+        failed = True
+
+    if total_ms > budget_ms:
+        print(f"❌ import app.main took {total_ms:.0f} ms (budget {budget_ms:.0f} ms, baseline {BASELINE_MS} ms)")
+        failed = True
+    else:
+        print(f"✅ import app.main took {total_ms:.0f} ms (budget {budget_ms:.0f} ms, baseline {BASELINE_MS} ms)")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
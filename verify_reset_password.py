@@ -1,30 +1,29 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi import HTTPException
 from app.schemas.user import UserResetPassword
-from jose import jwt
+from app.core.security import create_access_token
 
 def verify_reset_password_logic():
     print("Verifying reset_password logic...")
 
     # Patch dependencies
     with patch("app.api.routes.auth.get_db"), \
-         patch("app.api.routes.auth.hash_password") as mock_hash_password, \
-         patch("app.api.routes.auth.SECRET_KEY", "test_secret"), \
-         patch("app.api.routes.auth.ALGORITHM", "HS256"):
+         patch("app.api.routes.auth.hash_password_async") as mock_hash_password:
 
         from app.api.routes.auth import reset_password
         from app.db.models.user import User
 
         # Setup mock db
-        mock_db = MagicMock()
+        mock_db = AsyncMock()
         mock_user = MagicMock(spec=User)
         mock_user.email = "test@example.com"
         mock_user.password = "old_password"
 
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_user
+        mock_db.scalar.return_value = mock_user
 
         # Create a valid token
-        valid_token = jwt.encode({"sub": "test@example.com"}, "test_secret", algorithm="HS256")
+        valid_token = create_access_token({"sub": "test@example.com"})
         
         # Test Case 1: Success
         print("\nTest Case 1: Reset Password Success...")
@@ -36,10 +35,10 @@ def verify_reset_password_logic():
             confirm_new_password="new_password"
         )
 
-        response = reset_password(
+        response = asyncio.run(reset_password(
             request=payload,
             db=mock_db
-        )
+        ))
 
         assert mock_user.password == "hashed_new_password"
         assert response.code == 200
@@ -56,10 +55,10 @@ def verify_reset_password_logic():
         )
 
         try:
-            reset_password(
+            asyncio.run(reset_password(
                 request=payload_invalid,
                 db=mock_db
-            )
+            ))
         except HTTPException as e:
             assert e.status_code == 400
             assert "Invalid" in e.detail or "expired" in e.detail
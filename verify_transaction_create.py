@@ -1,5 +1,5 @@
 import asyncio
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
 from fastapi import UploadFile
 
@@ -12,19 +12,22 @@ def verify_create_transaction_logic():
     # We need to test the create_transaction function
     # But it relies on `Transaction` class and `upload_image` utility.
     
-    # Patch the class definition itself to ensure all imports get the mock
-    with patch("app.db.models.transaction.Transaction") as MockTransaction, \
+    # Patch the name the route module uses
+    with patch("app.api.routes.transaction.Transaction") as MockTransaction, \
          patch("app.api.routes.transaction.upload_image") as mock_upload_image, \
          patch("app.api.routes.transaction.get_db"), \
-         patch("app.api.routes.transaction.get_current_user"), \
-         patch("app.schemas.transaction.TransactionOut") as MockTransactionOut:
+         patch("app.api.routes.transaction.get_current_principal"), \
+         patch("app.api.routes.transaction._get_transaction_out"), \
+         patch("app.api.routes.transaction.apply_contribution_delta"), \
+         patch("app.api.routes.transaction.TransactionOut") as MockTransactionOut:
 
         from app.api.routes.transaction import create_transaction
-        from app.db.models.user import User
+        from app.api.routes.auth import CurrentPrincipal
 
         # Setup mocks
-        mock_db = MagicMock()
-        mock_current_user = MagicMock(spec=User)
+        mock_db = AsyncMock()
+        mock_db.add = MagicMock()
+        mock_current_user = MagicMock(spec=CurrentPrincipal)
         mock_current_user.id = 999 
         mock_upload_image.return_value = "http://cloudinary.com/image.jpg"
         
@@ -43,7 +46,7 @@ def verify_create_transaction_logic():
         mock_tx_instance = MagicMock()
         MockTransaction.return_value = mock_tx_instance
         
-        response = create_transaction(
+        response = asyncio.run(create_transaction(
             userId=10,
             reportedByUserId=None,
             amount=50000,
@@ -53,7 +56,7 @@ def verify_create_transaction_logic():
             file=mock_file,
             db=mock_db,
             current_user=mock_current_user
-        )
+        ))
 
         MockTransaction.assert_called_with(
             amount=50000,
@@ -68,7 +71,7 @@ def verify_create_transaction_logic():
 
         # Test Case 2: Explicit reportedByUserId
         print("\nTest Case 2: userId=10, reportedByUserId=55")
-        create_transaction(
+        asyncio.run(create_transaction(
             userId=10,
             reportedByUserId=55,
             amount=50000,
@@ -78,7 +81,7 @@ def verify_create_transaction_logic():
             file=mock_file,
             db=mock_db,
             current_user=mock_current_user
-        )
+        ))
 
         # Assertions
         # Get the call args
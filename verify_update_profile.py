@@ -1,4 +1,5 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi import UploadFile, HTTPException
 
 
@@ -9,7 +10,7 @@ def verify_update_profile_logic():
     with patch("app.api.routes.user.get_db"), \
          patch("app.api.routes.user.get_current_user"), \
          patch("app.api.routes.user.upload_image") as mock_upload_image, \
-         patch("app.api.routes.user.hash_password") as mock_hash_password:
+         patch("app.api.routes.user.hash_password_async") as mock_hash_password:
 
         from app.api.routes.user import update_own_profile
         from app.db.models.user import User
@@ -26,7 +27,7 @@ def verify_update_profile_logic():
         mock_user.user_type = "user" # Required for Pydantic
         
         # Setup mock db
-        mock_db = MagicMock()
+        mock_db = AsyncMock()
 
         # Test Case 1: Send empty strings and empty file (should be ignored)
         print("\nTest Case 1: Sending empty values...")
@@ -34,7 +35,7 @@ def verify_update_profile_logic():
         mock_empty_file = MagicMock(spec=UploadFile)
         mock_empty_file.filename = "" 
 
-        response = update_own_profile(
+        response = asyncio.run(update_own_profile(
             fullname="",
             username="",
             email="",
@@ -44,7 +45,7 @@ def verify_update_profile_logic():
             image_profile=mock_empty_file,
             db=mock_db,
             current_user=mock_user
-        )
+        ))
 
         assert mock_user.fullname == "Original Name"
         assert mock_user.username == "originaluser"
@@ -57,14 +58,14 @@ def verify_update_profile_logic():
         
         # Mock checks for uniqueness (return None means no existing user found)
         # Sequence: 1. check username -> None, 2. check email -> None
-        mock_db.query.return_value.filter.return_value.first.side_effect = [None, None]
+        mock_db.scalar.side_effect = [None, None]
         
         mock_valid_file = MagicMock(spec=UploadFile)
         mock_valid_file.filename = "new_pic.jpg"
         mock_upload_image.return_value = "http://new.com/image.jpg"
         mock_hash_password.return_value = "hashed_new_password"
 
-        update_own_profile(
+        asyncio.run(update_own_profile(
             fullname="New Name",
             username="newuser",
             email="new@example.com",
@@ -74,7 +75,7 @@ def verify_update_profile_logic():
             image_profile=mock_valid_file,
             db=mock_db,
             current_user=mock_user
-        )
+        ))
 
         assert mock_user.fullname == "New Name"
         assert mock_user.username == "newuser"
@@ -88,13 +89,13 @@ def verify_update_profile_logic():
         
         # Mock existing user found
         mock_existing_user = MagicMock(spec=User)
-        mock_db.query.return_value.filter.return_value.first.side_effect = [mock_existing_user]
+        mock_db.scalar.side_effect = [mock_existing_user]
         
         # Reset user username for test
         mock_user.username = "originaluser"
 
         try:
-            update_own_profile(
+            asyncio.run(update_own_profile(
                 username="takenuser",
                 # Pass None for other optional args checks to avoid default Form() object
                 fullname=None,
@@ -104,7 +105,7 @@ def verify_update_profile_logic():
                 password=None,
                 db=mock_db,
                 current_user=mock_user
-            )
+            ))
         except HTTPException as e:
             assert e.status_code == 400
             assert e.detail == "Username already registered"
@@ -114,13 +115,13 @@ def verify_update_profile_logic():
         print("\nTest Case 4: Duplicate Email...")
         
          # Reset side effect: 1. username check (None - ok), 2. email check (Existing User - fail)
-        mock_db.query.return_value.filter.return_value.first.side_effect = [None, mock_existing_user]
+        mock_db.scalar.side_effect = [None, mock_existing_user]
         
         # Reset user email
         mock_user.email = "original@example.com"
 
         try:
-            update_own_profile(
+            asyncio.run(update_own_profile(
                 username="newuser_unique",
                 email="taken@example.com",
                 fullname=None,
@@ -129,7 +130,7 @@ def verify_update_profile_logic():
                 password=None,
                 db=mock_db,
                 current_user=mock_user
-            )
+            ))
         except HTTPException as e:
             assert e.status_code == 400
             assert e.detail == "Email already registered"
@@ -140,7 +141,7 @@ def verify_update_profile_logic():
         try:
             # Simulate sending image_profile as empty string
             mock_user.email, mock_user.username = "test@example.com", "testuser" # Reset checks
-            update_own_profile(
+            asyncio.run(update_own_profile(
                 image_profile="", # Passing string instead of UploadFile
                 fullname=None,
                 username=None,
@@ -150,7 +151,7 @@ def verify_update_profile_logic():
                 password=None,
                 db=mock_db,
                 current_user=mock_user
-            )
+            ))
             print("  ✅ Empty string for image_profile was IGNORED (Success).")
         except Exception as e:
             print(f"  ❌ Failed: {e}")
@@ -1,4 +1,5 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi import UploadFile
 
 def verify_update_user_admin_logic():
@@ -6,15 +7,15 @@ def verify_update_user_admin_logic():
 
     # Patch dependencies
     with patch("app.api.routes.user.get_db"), \
-         patch("app.api.routes.user.get_current_user"), \
+         patch("app.api.routes.user.get_current_principal"), \
          patch("app.api.routes.user.upload_image") as mock_upload_image, \
-         patch("app.api.routes.user.hash_password") as mock_hash_password:
+         patch("app.api.routes.user.hash_password_async") as mock_hash_password:
 
         from app.api.routes.user import update_user
         from app.db.models.user import User
 
         # Setup mock db
-        mock_db = MagicMock()
+        mock_db = AsyncMock()
 
         # Setup mock admin user
         mock_admin = MagicMock(spec=User)
@@ -37,20 +38,17 @@ def verify_update_user_admin_logic():
         mock_target_user.phone_number = "12345"
         mock_target_user.domisili = "Original City"
         
-        # Mock DB query to return target user
-        # We use side_effect to handle sequence of calls:
-        # 1. Get user by ID (returns mock_target_user)
-        # 2. Check username uniqueness (returns None - success)
-        # 3. Check email uniqueness (returns None - success)
+        # db.get(User, id) returns the target user; the username / email
+        # uniqueness checks (db.scalar) find nobody
         
         # Test Case 1: Send empty strings and empty file (should be ignored)
         print("\nTest Case 1: Sending empty values...")
-        mock_db.query.return_value.filter.return_value.first.side_effect = [mock_target_user]
+        mock_db.get.return_value = mock_target_user
         
         mock_empty_file = MagicMock(spec=UploadFile)
         mock_empty_file.filename = "" 
 
-        response = update_user(
+        response = asyncio.run(update_user(
             user_id=99,
             fullname="",
             username="",
@@ -62,7 +60,7 @@ def verify_update_user_admin_logic():
             image_profile=mock_empty_file,
             db=mock_db,
             current_user=mock_admin
-        )
+        ))
 
         assert mock_target_user.fullname == "Original Name"
         assert mock_target_user.email == "original@example.com"
@@ -76,11 +74,7 @@ def verify_update_user_admin_logic():
         # Test Case 2: Send valid values as Admin
         print("\nTest Case 2: Sending valid values as Admin...")
         
-        # Reset side_effect for next call sequence
-        # 1. Get user by ID
-        # 2. Check username (returns None so it proceeds)
-        # 3. Check email (returns None so it proceeds)
-        mock_db.query.return_value.filter.return_value.first.side_effect = [mock_target_user, None, None]
+        mock_db.scalar.return_value = None
         
         mock_valid_file = MagicMock(spec=UploadFile)
         mock_valid_file.filename = "admin_upload.jpg"
@@ -90,7 +84,7 @@ def verify_update_user_admin_logic():
         mock_upload_image.reset_mock()
         mock_hash_password.reset_mock()
 
-        update_user(
+        asyncio.run(update_user(
             user_id=99,
             fullname="Admin Updated Name",
             username="admin_updated_user",
@@ -102,7 +96,7 @@ def verify_update_user_admin_logic():
             image_profile=mock_valid_file,
             db=mock_db,
             current_user=mock_admin
-        )
+        ))
 
         assert mock_target_user.fullname == "Admin Updated Name"
         assert mock_target_user.username == "admin_updated_user"